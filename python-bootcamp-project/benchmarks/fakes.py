@@ -0,0 +1,115 @@
+# OFFLINE STAND-INS
+# Deterministic replacements for OpenAI embeddings and chat models so the
+# benchmarks run without network access or API keys.
+
+import asyncio
+import hashlib
+import math
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "so",
+    "that", "the", "then", "this", "to", "was", "we", "what", "when", "which",
+    "why", "with", "you", "your",
+}
+
+
+class HashingEmbeddings(Embeddings):
+    """Bag-of-words vectors: each word is hashed into one of `dim` buckets.
+
+    Stable across processes (blake2b instead of hash()), l2-normalized, and
+    lexical enough that a question lands near the chunks sharing its words.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _embed(self, text):
+        vector = [0.0] * self.dim
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            if token in _STOPWORDS:
+                continue
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest, "little") % self.dim] += 1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def count_tokens(text):
+    return len(text.split())
+
+
+def stub_reply(system, question):
+    """Reply of the stub models: echo for the rewrite prompt, short answer otherwise"""
+    if "standalone question" in system:
+        return question
+    return f"Based on {count_tokens(system)} words of video context: {question}"
+
+
+class StubChatModel(BaseChatModel):
+    """Chat model that answers instantly (or after `latency` seconds).
+
+    The question-rewrite prompt gets the user question back unchanged, so
+    retrieval behaves like a perfect rewrite; answer prompts get a short
+    deterministic reply. Token usage is approximated by word counts.
+    """
+
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        system = next((m.content for m in messages if isinstance(m, SystemMessage)), "")
+        question = next(
+            (m.content for m in reversed(messages) if isinstance(m, HumanMessage)), ""
+        )
+        content = stub_reply(system, question)
+        input_tokens = sum(count_tokens(str(m.content)) for m in messages)
+        output_tokens = count_tokens(content)
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
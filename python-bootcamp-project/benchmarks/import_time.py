@@ -0,0 +1,126 @@
+# IMPORT-TIME BENCHMARK
+# Cold-start cost of the app and of each heavy dependency, every measurement
+# in a fresh interpreter so nothing is already in sys.modules.
+#
+#   uv run python -m benchmarks.import_time --runs 5
+#
+# Also lists which heavy modules importing youtube_agent_mvp pulls in; with
+# lazy imports only streamlit and yaml should appear, the rest load when a
+# page actually needs them.
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+APP_MODULE = "youtube_agent_mvp"
+HEAVY_MODULES = [
+    "streamlit",
+    "yaml",
+    "pandas",
+    "googleapiclient.discovery",
+    "youtube_transcript_api",
+    "langchain_core",
+    "chat_history",
+    "langchain_openai",
+    "langchain_chroma",
+    "chromadb",
+    "langchain.chains",
+    "langchain_pytubefix.youtube",
+    "rag_chain",
+    "rag_service",
+]
+
+_TIMER = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {watch!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(module, watch=()):
+    """Seconds to import `module` in a new interpreter, and which watched modules it loaded"""
+    result = subprocess.run(
+        [sys.executable, "-c", _TIMER.format(module=module, watch=list(watch))],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+        return None, error
+    # Streamlit may log warnings to stdout when imported outside `streamlit run`
+    return json.loads(result.stdout.strip().splitlines()[-1]), None
+
+
+def top_imports(module, limit):
+    """Largest cumulative entries of `python -X importtime`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    # Lines look like "import time:  self_us | cumulative_us | <indent>name"
+    top_level = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|", 2)
+        name = name[1:]
+        # Only top-level imports, otherwise parents and children repeat the same time
+        if not name.startswith(" "):
+            top_level[name] = max(int(cumulative_us), top_level.get(name, 0))
+    return sorted(top_level.items(), key=lambda item: -item[1])[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports of the app to list")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = {"modules": {}}
+    for module in [APP_MODULE] + HEAVY_MODULES:
+        samples = []
+        loaded = []
+        error = None
+        for _ in range(args.runs):
+            measurement, error = time_import(module, HEAVY_MODULES)
+            if measurement is None:
+                break
+            samples.append(measurement["seconds"])
+            loaded = measurement["loaded"]
+        if not samples:
+            results["modules"][module] = {"error": error}
+            print(f"⚠️  {module:<45} {error}")
+            continue
+        results["modules"][module] = {
+            "median_ms": statistics.median(samples) * 1000,
+            "min_ms": min(samples) * 1000,
+            "loaded_heavy_modules": [m for m in loaded if m != module],
+        }
+        print(f"⏱️  {module:<45} {statistics.median(samples) * 1000:8.1f} ms")
+
+    app = results["modules"][APP_MODULE]
+    if "error" not in app:
+        print(f"\n📦 Heavy modules loaded by importing {APP_MODULE}: {', '.join(app['loaded_heavy_modules']) or 'none'}")
+        results["app_top_imports"] = top_imports(APP_MODULE, args.top)
+        print(f"🐢 Heaviest imports of {APP_MODULE} (cumulative):")
+        for name, cumulative_us in results["app_top_imports"]:
+            print(f"   {name:<45} {cumulative_us / 1000:8.1f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
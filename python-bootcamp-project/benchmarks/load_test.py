@@ -0,0 +1,207 @@
+# LOAD TEST
+# Capacity planning for one app process: N simulated chat sessions, each with
+# its own multi-turn history, send questions through the same RAGService path
+# the Streamlit page uses. LLM and embedding calls go over HTTP to a stub
+# OpenAI-compatible server (benchmarks/stub_llm_server.py) running in a
+# separate process with configurable latency.
+#
+#   uv run python -m benchmarks.load_test --sessions 1,10,50,100 --turns 4 --latency 0.8
+#
+# Per concurrency level it reports throughput, p50/p95/p99 latency, errors,
+# resident memory growth per session and the per-stage breakdown.
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from benchmarks.fakes import HashingEmbeddings
+from benchmarks.rag_offline import QUESTIONS_FILE, load_transcript_chunks, shared_store
+from rag_metrics import MetricsRegistry
+from rag_service import RAGService
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def _current_rss_mb():
+    """Resident memory now (Linux); falls back to the peak elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stub_server(args):
+    """Run the stub LLM in its own process so it doesn't share our GIL"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.stub_llm_server",
+            "--port", str(port),
+            "--latency", str(args.latency),
+            "--jitter", str(args.jitter),
+            "--embedding-latency", str(args.embedding_latency),
+            "--dim", str(args.dim),
+        ],
+        cwd=PROJECT_DIR,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    # The server prints one line once it is listening
+    if not process.stdout.readline():
+        process.kill()
+        raise RuntimeError("Stub LLM server failed to start")
+    return process, f"http://127.0.0.1:{port}/v1"
+
+
+async def run_session(service, session_index, topic, questions, turns, think_time, samples_ms, errors):
+    """One user: ask `turns` questions in a row, carrying the chat history"""
+    session_id = f"load-{session_index}"
+    rng = random.Random(session_index)
+    chat_history = []
+    for _ in range(turns):
+        question = rng.choice(questions)
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wrap_future(
+                service.submit(session_id, topic, question, chat_history)
+            )
+        except Exception as e:
+            errors.append(repr(e))
+            continue
+        samples_ms.append((time.perf_counter() - start) * 1000)
+        chat_history += [HumanMessage(question), AIMessage(response["answer"])]
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+    return chat_history
+
+
+async def run_level(service, sessions, topic, questions, args):
+    samples_ms, errors = [], []
+    start = time.perf_counter()
+    histories = await asyncio.gather(*(
+        run_session(service, i, topic, questions, args.turns, args.think_time, samples_ms, errors)
+        for i in range(sessions)
+    ))
+    return time.perf_counter() - start, samples_ms, errors, histories
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent chat session load test")
+    parser.add_argument("--sessions", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--turns", type=int, default=4, help="Questions per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds between turns")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub seconds per chat completion")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--max-concurrent", type=int, default=32, help="RAGService max_concurrent_requests")
+    parser.add_argument("--per-session-limit", type=int, default=1)
+    parser.add_argument("--max-connections", type=int, default=64)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--server-url", help="Use a running stub/compatible server instead of starting one")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    fixture = json.loads(QUESTIONS_FILE.read_text(encoding="utf-8"))
+    topic = fixture["topic"]
+    questions = [item["question"] for item in fixture["questions"]]
+    levels = [int(level) for level in args.sessions.split(",") if level.strip()]
+
+    server_process = None
+    if args.server_url:
+        base_url = args.server_url
+    else:
+        server_process, base_url = start_stub_server(args)
+
+    results = {"config": vars(args), "levels": []}
+    try:
+        with tempfile.TemporaryDirectory(prefix="rag_load_") as workdir:
+            # Built and searched like the app: shared store + topic view
+            texts, metadatas = load_transcript_chunks()
+            shared_store(workdir, HashingEmbeddings(dim=args.dim)).add_chunks(topic, texts, metadatas)
+
+            for sessions in levels:
+                service = RAGService(
+                    max_concurrent_requests=args.max_concurrent,
+                    per_session_limit=args.per_session_limit,
+                    max_connections=args.max_connections,
+                    openai_base_url=base_url,
+                    openai_api_key="stub",
+                    vectorstore_factory=lambda topic, embeddings: shared_store(
+                        workdir, embeddings
+                    ).topic_view(topic),
+                    metrics=MetricsRegistry(),
+                )
+                # One warm-up request loads langchain_openai and builds the LLM,
+                # embeddings and chain, so that one-off cost isn't charged to the sessions
+                service.submit("warmup", topic, questions[0]).result()
+                service.metrics = MetricsRegistry()
+                rss_before = _current_rss_mb()
+                elapsed, samples_ms, errors, histories = asyncio.run(
+                    run_level(service, sessions, topic, questions, args)
+                )
+                rss_after = _current_rss_mb()
+                stages = service.metrics.summary()["stages"]
+                service.close()
+
+                level = {
+                    "sessions": sessions,
+                    "requests": len(samples_ms),
+                    "errors": len(errors),
+                    "error_samples": errors[:3],
+                    "seconds": elapsed,
+                    "throughput_rps": len(samples_ms) / elapsed if elapsed else 0.0,
+                    "p50_ms": _percentile(samples_ms, 0.5) if samples_ms else None,
+                    "p95_ms": _percentile(samples_ms, 0.95) if samples_ms else None,
+                    "p99_ms": _percentile(samples_ms, 0.99) if samples_ms else None,
+                    "rss_growth_mb": rss_after - rss_before,
+                    "rss_growth_per_session_kb": (rss_after - rss_before) * 1024 / sessions,
+                    "history_messages_per_session": sum(map(len, histories)) / sessions,
+                    "stage_p50_ms": {stage: stats["p50_ms"] for stage, stats in stages.items()},
+                }
+                results["levels"].append(level)
+                if level["requests"]:
+                    print(
+                        f"👥 {sessions:>4} sessions | {level['throughput_rps']:7.2f} req/s | "
+                        f"p50 {level['p50_ms']:8.1f} ms | p95 {level['p95_ms']:8.1f} ms | "
+                        f"p99 {level['p99_ms']:8.1f} ms | errors {level['errors']} | "
+                        f"+{level['rss_growth_per_session_kb']:.1f} KB/session",
+                        flush=True,
+                    )
+                else:
+                    print(f"👥 {sessions:>4} sessions | all {level['errors']} requests failed: {level['error_samples']}")
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, default=str), encoding="utf-8")
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
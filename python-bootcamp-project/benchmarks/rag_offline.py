@@ -0,0 +1,303 @@
+# OFFLINE RAG BENCHMARK
+# Reproducible numbers for the build and query paths without network access:
+#
+#   uv run python -m benchmarks.rag_offline
+#   uv run python -m benchmarks.rag_offline --scale 20 --output results.json
+#
+# 1. build      chunk + embed + store data/youtube_videos3.csv into a temporary
+#               shared store, as the app builds topics (chunks/s)
+# 2. retrieval  fixed question set against that topic's view (p50/p99, recall@k)
+# 3. chain      full history-aware RAG chain with a stub LLM, stage breakdown
+# 4. prebuilt   the bundled MCP database, queried with its own stored vectors
+#               (p50/p99, HNSW recall@k against exact search)
+#
+# Embeddings and the chat model are deterministic stand-ins (benchmarks/fakes.py),
+# so results only move when our code does. Run from the project root.
+
+import argparse
+import csv
+import json
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.fakes import HashingEmbeddings, StubChatModel
+from query_filters import stored_channels
+from rag_chain import build_rag_chain
+from rag_metrics import MetricsRegistry, RAGTraceHandler
+from shared_store import SharedKnowledgeBase
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+TRANSCRIPTS_CSV = PROJECT_DIR / "data" / "youtube_videos3.csv"
+PREBUILT_DB = PROJECT_DIR / "data" / "mvp_VIBE_CODING_MCP_DEVELOPMENT_TUTORIAL_db"
+QUESTIONS_FILE = Path(__file__).resolve().parent / "questions.json"
+
+# Same fixed-size chunking as AdvancedRAG.create_knowledge_base
+CHUNK_SIZE = 1000
+
+
+def _latency_stats(samples_ms):
+    ordered = sorted(samples_ms)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p50_ms": pick(0.5),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1],
+    }
+
+
+class _MemoryProbe:
+    """Peak Python allocations of a block (tracemalloc)"""
+
+    def __enter__(self):
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.peak_mb = peak / (1024 * 1024)
+
+
+def load_transcript_chunks(scale=1):
+    """Chunk the bundled transcripts; `scale` repeats the corpus for volume.
+
+    Copies get their own video IDs, or the shared store would dedupe them;
+    `source_video_id` keeps the original for recall checks.
+    """
+    csv.field_size_limit(sys.maxsize)
+    with open(TRANSCRIPTS_CSV, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    texts, metadatas = [], []
+    for copy in range(scale):
+        for row in rows:
+            transcript = row["page_content"]
+            for i in range(0, len(transcript), CHUNK_SIZE):
+                texts.append(transcript[i:i + CHUNK_SIZE])
+                metadatas.append({
+                    "title": row["title"],
+                    "channel": row["author"],
+                    "video_id": row["source"] if copy == 0 else f"{row['source']}-copy{copy}",
+                    "source_video_id": row["source"],
+                    "url": row["video_url"],
+                    "view_count": int(row["view_count"] or 0),
+                    "copy": copy,
+                })
+    return texts, metadatas
+
+
+def shared_store(workdir, embeddings):
+    """Shared store (chunks + topic index) inside a work directory"""
+    return SharedKnowledgeBase(
+        embeddings,
+        path=str(Path(workdir) / "shared_kb_db"),
+        topics_path=str(Path(workdir) / "shared_kb_topics.sqlite3"),
+    )
+
+
+def bench_build(workdir, embeddings, topic, scale, repeat):
+    texts, metadatas = load_transcript_chunks(scale)
+
+    def build(name):
+        """Same path as AdvancedRAG.create_knowledge_base; returns the topic view"""
+        knowledge_base = shared_store(Path(workdir) / name, embeddings)
+        knowledge_base.add_chunks(topic, texts, metadatas)
+        return knowledge_base.topic_view(topic)
+
+    # Timed runs without tracemalloc, which slows every allocation
+    runs = []
+    vectorstore = None
+    for run in range(repeat):
+        start = time.perf_counter()
+        vectorstore = build(f"build_{run}")
+        elapsed = time.perf_counter() - start
+        runs.append({"seconds": elapsed, "chunks_per_second": len(texts) / elapsed})
+
+    # Peak memory from a separate, untimed run
+    with _MemoryProbe() as memory:
+        build("build_memory")
+
+    return vectorstore, {
+        "chunks": len(texts),
+        "runs": runs,
+        "best_chunks_per_second": max(run["chunks_per_second"] for run in runs),
+        "peak_python_mb": memory.peak_mb,
+    }
+
+
+def bench_retrieval(vectorstore, questions, k, iterations):
+    samples_ms = []
+    hits = 0
+    for item in questions:
+        for iteration in range(iterations):
+            start = time.perf_counter()
+            documents = vectorstore.similarity_search(item["question"], k=k)
+            samples_ms.append((time.perf_counter() - start) * 1000)
+            if iteration == 0:
+                hits += any(doc.metadata.get("source_video_id") == item["video_id"] for doc in documents)
+    return {**_latency_stats(samples_ms), f"recall_at_{k}": hits / len(questions)}
+
+
+def bench_chain(vectorstore, topic, questions, conversations, k):
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    chain = build_rag_chain(
+        StubChatModel(), vectorstore, topic, k=k, channels=stored_channels(vectorstore)
+    )
+
+    def run_all(registry, samples_ms):
+        """Every question and conversation once; returns (hits, total)"""
+        hits = 0
+        total = 0
+
+        def ask(question, chat_history):
+            handler = RAGTraceHandler(registry, topic=topic)
+            start = time.perf_counter()
+            response = chain.invoke(
+                {"input": question, "chat_history": chat_history},
+                config={"callbacks": [handler]},
+            )
+            samples_ms.append((time.perf_counter() - start) * 1000)
+            return response
+
+        for item in questions:
+            response = ask(item["question"], [])
+            hits += any(doc.metadata.get("source_video_id") == item["video_id"] for doc in response["context"])
+            total += 1
+
+        for conversation in conversations:
+            chat_history = []
+            for turn in conversation:
+                response = ask(turn["question"], chat_history)
+                hits += any(doc.metadata.get("source_video_id") == turn["video_id"] for doc in response["context"])
+                total += 1
+                chat_history += [HumanMessage(turn["question"]), AIMessage(response["answer"])]
+        return hits, total
+
+    # Latencies and stages come from a run without tracemalloc; peak memory
+    # from a second run whose timings are discarded
+    registry = MetricsRegistry()
+    samples_ms = []
+    hits, total = run_all(registry, samples_ms)
+    with _MemoryProbe() as memory:
+        run_all(MetricsRegistry(), [])
+
+    return {
+        **_latency_stats(samples_ms),
+        f"recall_at_{k}": hits / total,
+        "peak_python_mb": memory.peak_mb,
+        "stages": registry.summary()["stages"],
+        "tokens": {
+            name: value
+            for name, value in registry.summary()["counters"].items()
+            if name.startswith("tokens_")
+        },
+    }
+
+
+def bench_prebuilt(workdir, k, queries, seed):
+    """Query the bundled database with its own vectors, never touching the original"""
+    import chromadb
+    import numpy as np
+
+    if not PREBUILT_DB.exists():
+        return {"skipped": f"{PREBUILT_DB} not found"}
+    db_copy = Path(workdir) / "prebuilt"
+    shutil.copytree(PREBUILT_DB, db_copy)
+
+    client = chromadb.PersistentClient(path=str(db_copy))
+    collection = client.get_collection("langchain")
+    stored = collection.get(include=["embeddings"])
+    ids = stored["ids"]
+    vectors = np.asarray(stored["embeddings"], dtype=np.float32)
+
+    rng = random.Random(seed)
+    query_rows = [rng.randrange(len(ids)) for _ in range(queries)]
+
+    samples_ms = []
+    recall_total = 0.0
+    for row in query_rows:
+        query = vectors[row]
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k)
+        samples_ms.append((time.perf_counter() - start) * 1000)
+
+        # Exact l2 neighbours as ground truth for the approximate index
+        distances = np.linalg.norm(vectors - query, axis=1)
+        exact = {ids[i] for i in np.argsort(distances)[:k]}
+        recall_total += len(exact & set(result["ids"][0])) / k
+
+    return {
+        "chunks": len(ids),
+        "dimensions": int(vectors.shape[1]),
+        **_latency_stats(samples_ms),
+        f"hnsw_recall_at_{k}": recall_total / len(query_rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline RAG benchmark")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the transcript corpus N times")
+    parser.add_argument("--repeat", type=int, default=3, help="Build runs")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed searches per question")
+    parser.add_argument("--prebuilt-queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=3, help="Documents per search (chat uses 3)")
+    parser.add_argument("--dim", type=int, default=384, help="Fake embedding dimensions")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    fixture = json.loads(QUESTIONS_FILE.read_text(encoding="utf-8"))
+    embeddings = HashingEmbeddings(dim=args.dim)
+    results = {"config": vars(args)}
+
+    with tempfile.TemporaryDirectory(prefix="rag_bench_") as workdir:
+        vectorstore, results["build"] = bench_build(
+            workdir, embeddings, fixture["topic"], args.scale, args.repeat
+        )
+        results["retrieval"] = bench_retrieval(
+            vectorstore, fixture["questions"], args.k, args.iterations
+        )
+        results["chain"] = bench_chain(
+            vectorstore, fixture["topic"], fixture["questions"], fixture["conversations"], args.k
+        )
+        results["prebuilt"] = bench_prebuilt(workdir, args.k, args.prebuilt_queries, args.seed)
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["max_rss_mb"] = max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    build = results["build"]
+    retrieval = results["retrieval"]
+    chain = results["chain"]
+    prebuilt = results["prebuilt"]
+    print(f"📦 Build:     {build['chunks']} chunks, best {build['best_chunks_per_second']:.1f} chunks/s")
+    print(f"🔍 Retrieval: p50 {retrieval['p50_ms']:.2f} ms | p99 {retrieval['p99_ms']:.2f} ms | recall@{args.k} {retrieval[f'recall_at_{args.k}']:.2f}")
+    print(f"💬 Chain:     p50 {chain['p50_ms']:.2f} ms | p99 {chain['p99_ms']:.2f} ms | recall@{args.k} {chain[f'recall_at_{args.k}']:.2f}")
+    for stage, stats in chain["stages"].items():
+        print(f"   - {stage:<14} p50 {stats['p50_ms']:.2f} ms")
+    if "skipped" in prebuilt:
+        print(f"🗄️  Prebuilt:  skipped ({prebuilt['skipped']})")
+    else:
+        print(f"🗄️  Prebuilt:  {prebuilt['chunks']} chunks | p50 {prebuilt['p50_ms']:.2f} ms | p99 {prebuilt['p99_ms']:.2f} ms | HNSW recall@{args.k} {prebuilt[f'hnsw_recall_at_{args.k}']:.2f}")
+    print(f"🧠 Max RSS:   {results['max_rss_mb']:.1f} MB")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, default=str), encoding="utf-8")
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# STUB LLM SERVER
+# Minimal OpenAI-compatible server for load tests: /v1/chat/completions and
+# /v1/embeddings answer with the same deterministic stand-ins as the offline
+# benchmark, after a configurable delay that imitates real API latency.
+#
+#   uv run python -m benchmarks.stub_llm_server --port 8765 --latency 0.8 --jitter 0.2
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fakes import HashingEmbeddings, count_tokens, stub_reply
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so pooled clients reuse connections like they would with OpenAI
+    protocol_version = "HTTP/1.1"
+
+    def _delay(self, seconds):
+        jitter = self.server.jitter
+        delay = seconds + (random.uniform(-jitter, jitter) if jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chat_completion(self, body):
+        messages = body.get("messages", [])
+        system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+        question = next(
+            (m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), ""
+        )
+        content = stub_reply(system, question)
+        prompt_tokens = sum(count_tokens(str(m.get("content") or "")) for m in messages)
+        completion_tokens = count_tokens(content)
+
+        self._delay(self.server.latency)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _embeddings(self, body):
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        # Token-id inputs are hashed as text; vectors only need to be stable
+        texts = [item if isinstance(item, str) else " ".join(map(str, item)) for item in inputs]
+        vectors = self.server.embeddings.embed_documents(texts)
+
+        self._delay(self.server.embedding_latency)
+        return {
+            "object": "list",
+            "data": [
+                {"object": "embedding", "index": i, "embedding": vector}
+                for i, vector in enumerate(vectors)
+            ],
+            "model": body.get("model", "stub"),
+            "usage": {
+                "prompt_tokens": sum(count_tokens(text) for text in texts),
+                "total_tokens": sum(count_tokens(text) for text in texts),
+            },
+        }
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path.endswith("/chat/completions"):
+            if body.get("stream"):
+                self._send_json(400, {"error": {"message": "Streaming is not supported by the stub"}})
+                return
+            self._send_json(200, self._chat_completion(body))
+        elif self.path.endswith("/embeddings"):
+            self._send_json(200, self._embeddings(body))
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=0, latency=0.5, jitter=0.0, embedding_latency=0.05, dim=384):
+    """Create (not start) a stub server; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), StubLLMHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.embedding_latency = embedding_latency
+    server.embeddings = HashingEmbeddings(dim=dim)
+    return server
+
+
+def start_in_thread(**kwargs):
+    """Start a stub server on a daemon thread; returns (server, base_url)"""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per chat completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± seconds of uniform noise")
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimensions")
+    args = parser.parse_args()
+
+    server = make_server(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        embedding_latency=args.embedding_latency,
+        dim=args.dim,
+    )
+    print(f"🤖 Stub LLM listening on http://{args.host}:{server.server_address[1]}/v1", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
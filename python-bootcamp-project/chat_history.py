@@ -0,0 +1,175 @@
+# PERSISTENT CHAT HISTORY
+# Chat messages live in a local SQLite database (WAL mode, so chat sessions
+# writing at the same time don't block each other's reads). Each session only
+# keeps its last `window` messages in memory; older ones are paged from disk
+# when the UI asks for them. History survives restarts, and process memory
+# stays flat however long the server runs.
+#
+# Messages older than CHAT_HISTORY_MAX_AGE_DAYS (default 30, 0 keeps
+# everything) are deleted while the app writes new ones, at most once an
+# hour, so the database doesn't grow without bound either.
+
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import closing
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+CHAT_DB_PATH = "data/chat_history.sqlite3"
+DEFAULT_WINDOW = 20
+DEFAULT_MAX_AGE_DAYS = 30
+PRUNE_INTERVAL_SECONDS = 3600
+
+_MESSAGE_TYPES = {"human": HumanMessage, "ai": AIMessage, "system": SystemMessage}
+
+# Whoever knows a session ID can read that history, so IDs are 256 random
+# bits and only IDs of exactly that shape are accepted from a URL
+_SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{43}")
+
+
+def new_session_id():
+    """Unguessable session ID (32 random bytes, URL-safe)"""
+    return secrets.token_urlsafe(32)
+
+
+def is_valid_session_id(session_id):
+    return isinstance(session_id, str) and bool(_SESSION_ID_PATTERN.fullmatch(session_id))
+
+
+# STORAGE
+class ChatHistoryStore:
+    """Messages of all sessions as (session_id, role, content) rows.
+
+    With `max_age_seconds`, older messages are pruned on write, at most
+    every `prune_interval` seconds.
+    """
+
+    def __init__(self, path=CHAT_DB_PATH, max_age_seconds=None, prune_interval=PRUNE_INTERVAL_SECONDS):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self.prune_interval = prune_interval
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._next_prune = 0.0
+
+    def _connect(self):
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            # WAL is stored in the database file, so setting it once is enough
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "role TEXT NOT NULL, content TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id)"
+            )
+            self._initialized = True
+        return conn
+
+    def append(self, session_id, messages):
+        """Store messages; returns their row IDs"""
+        rows = [(session_id, message.type, message.content, time.time()) for message in messages]
+        with self._lock, closing(self._connect()) as conn, conn:
+            if self.max_age_seconds and time.time() >= self._next_prune:
+                self._delete_older_than(conn, self.max_age_seconds)
+                self._next_prune = time.time() + self.prune_interval
+            return [
+                conn.execute(
+                    "INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                    row,
+                ).lastrowid
+                for row in rows
+            ]
+
+    def page(self, session_id, limit, before_id=None):
+        """Up to `limit` (id, message) pairs before `before_id`, oldest first"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, role, content FROM messages WHERE session_id = ? AND id < ? "
+                "ORDER BY id DESC LIMIT ?",
+                (session_id, before_id if before_id is not None else 2**63 - 1, limit),
+            ).fetchall()
+        return [
+            (row_id, _MESSAGE_TYPES.get(role, AIMessage)(content=content))
+            for row_id, role, content in reversed(rows)
+        ]
+
+    def count(self, session_id):
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+
+    def clear(self, session_id):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+    @staticmethod
+    def _delete_older_than(conn, max_age_seconds):
+        return conn.execute(
+            "DELETE FROM messages WHERE created_at < ?", (time.time() - max_age_seconds,)
+        ).rowcount
+
+    def prune(self, max_age_seconds=None):
+        """Delete messages older than `max_age_seconds` (default: the store's); returns how many"""
+        max_age_seconds = max_age_seconds or self.max_age_seconds
+        if not max_age_seconds:
+            return 0
+        with self._lock, closing(self._connect()) as conn, conn:
+            return self._delete_older_than(conn, max_age_seconds)
+
+
+def _default_max_age_seconds():
+    days = float(os.environ.get("CHAT_HISTORY_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+    return days * 86400 if days > 0 else None
+
+
+DEFAULT_STORE = ChatHistoryStore(max_age_seconds=_default_max_age_seconds())
+
+
+# CHAT MESSAGE HISTORY
+class SQLiteChatMessageHistory(BaseChatMessageHistory):
+    """Chat history of one session: every message on disk, the last `window` in memory.
+
+    `messages` is the in-memory window, which is also what the RAG chain
+    sees as chat history. Use `older_messages` to page further back.
+    """
+
+    def __init__(self, session_id, store=None, window=DEFAULT_WINDOW):
+        self.session_id = session_id
+        self.store = store or DEFAULT_STORE
+        self._window = deque(self.store.page(session_id, window), maxlen=window)
+
+    @property
+    def messages(self):
+        return [message for _, message in self._window]
+
+    def add_messages(self, messages):
+        messages = list(messages)
+        row_ids = self.store.append(self.session_id, messages)
+        self._window.extend(zip(row_ids, messages))
+
+    def older_messages(self, limit):
+        """Up to `limit` messages from just before the in-memory window, oldest first"""
+        if not self._window:
+            return []
+        return [message for _, message in self.store.page(self.session_id, limit, self._window[0][0])]
+
+    def count(self):
+        """Messages stored for the session, including those paged out of memory"""
+        return self.store.count(self.session_id)
+
+    def clear(self):
+        self.store.clear(self.session_id)
+        self._window.clear()
@@ -0,0 +1,321 @@
+# KNOWLEDGE BASE EXPORT / IMPORT
+# Columnar snapshots of a topic's vector database: one row per chunk with the
+# chunk text, its metadata as columns and the embedding as a fixed-size list.
+#
+#   python knowledge_base_io.py export "VIBE CODING MCP DEVELOPMENT TUTORIAL" mcp.parquet
+#   python knowledge_base_io.py import "VIBE CODING MCP DEVELOPMENT TUTORIAL" mcp.parquet
+#
+# Topics in the shared chunk store (shared_store.py) are exported with a
+# where-filter on their videos; older topics from their per-topic directory.
+# Importing loads the stored vectors straight into the shared store (or a
+# fresh per-topic collection with --db-path), so no embedding calls are made.
+# Files ending in .arrow/.feather use the Arrow IPC format, which is
+# memory-mapped and read without copying.
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+# Collection name used by langchain's Chroma wrapper
+DEFAULT_COLLECTION_NAME = "langchain"
+EMBEDDING_MODEL = "text-embedding-ada-002"
+BATCH_SIZE = 1000
+
+_ARROW_SUFFIXES = {".arrow", ".feather", ".ipc"}
+_RESERVED_COLUMNS = {"id", "document", "embedding", "extra_metadata"}
+
+
+def topic_db_path(topic):
+    """Directory of the vector database for a topic"""
+    return f"data/mvp_{topic.replace(' ', '_')}_db"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            'Could not import "pyarrow" Python package. '
+            "Please install it with `pip install pyarrow`."
+        )
+    return pa
+
+
+def _export_source(topic, db_path, collection_name):
+    """(db_path, collection_name, where) of the chunks to export for a topic"""
+    if db_path is None:
+        from shared_store import COLLECTION_NAME, SHARED_DB_PATH, SharedKnowledgeBase
+
+        where = SharedKnowledgeBase(embedding_function=None).topic_view(topic).topic_filter()
+        if where is not None:
+            return SHARED_DB_PATH, COLLECTION_NAME, where
+        db_path = topic_db_path(topic)
+    return db_path, collection_name, None
+
+
+def _open_collection(db_path, collection_name, create=False, metadata=None):
+    import chromadb
+
+    client = chromadb.PersistentClient(path=db_path)
+    if create:
+        return client, client.get_or_create_collection(collection_name, metadata=metadata or None)
+    return client, client.get_collection(collection_name)
+
+
+def _arrow_type(value, pa):
+    if isinstance(value, bool):
+        return pa.bool_()
+    if isinstance(value, int):
+        return pa.int64()
+    if isinstance(value, float):
+        return pa.float64()
+    return pa.string()
+
+
+def _build_schema(metadatas, dim, pa, schema_metadata):
+    """Schema with one column per metadata key seen in the first batch"""
+    metadata_fields = {}
+    for metadata in metadatas:
+        for key, value in (metadata or {}).items():
+            if key not in _RESERVED_COLUMNS and key not in metadata_fields:
+                metadata_fields[key] = _arrow_type(value, pa)
+
+    fields = [
+        pa.field("id", pa.string(), nullable=False),
+        pa.field("document", pa.string()),
+        pa.field("embedding", pa.list_(pa.float32(), dim), nullable=False),
+        *(pa.field(key, arrow_type) for key, arrow_type in metadata_fields.items()),
+        pa.field("extra_metadata", pa.string()),
+    ]
+    return pa.schema(fields, metadata=schema_metadata)
+
+
+def _to_record_batch(results, schema, pa):
+    import numpy as np
+
+    metadata_keys = [
+        name for name in schema.names
+        if name not in _RESERVED_COLUMNS
+    ]
+    metadatas = [metadata or {} for metadata in results["metadatas"]]
+    columns = {
+        "id": results["ids"],
+        "document": results["documents"],
+    }
+
+    embeddings = np.asarray(results["embeddings"], dtype=np.float32)
+    dim = schema.field("embedding").type.list_size
+    columns["embedding"] = pa.FixedSizeListArray.from_arrays(
+        pa.array(embeddings.reshape(-1)), dim
+    )
+
+    for key in metadata_keys:
+        columns[key] = [metadata.get(key) for metadata in metadatas]
+
+    # Keys that were not in the first batch don't fit the schema
+    columns["extra_metadata"] = [
+        json.dumps(extra) if extra else None
+        for extra in (
+            {key: value for key, value in metadata.items() if key not in schema.names}
+            for metadata in metadatas
+        )
+    ]
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def export_topic(topic, output_path, db_path=None, collection_name=DEFAULT_COLLECTION_NAME):
+    """Export a topic's chunks, metadata and vectors to Parquet or Arrow IPC"""
+    pa = _import_pyarrow()
+    db_path, collection_name, where = _export_source(topic, db_path, collection_name)
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"No database found at {db_path}")
+
+    _, collection = _open_collection(db_path, collection_name)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    writer = None
+    sink = None
+    schema = None
+    completed = False
+    exported = 0
+    try:
+        while True:
+            results = collection.get(
+                where=where,
+                include=["documents", "metadatas", "embeddings"],
+                limit=BATCH_SIZE,
+                offset=exported,
+            )
+            if not results["ids"]:
+                break
+            exported += len(results["ids"])
+
+            if writer is None:
+                dim = len(results["embeddings"][0])
+                schema = _build_schema(
+                    results["metadatas"],
+                    dim,
+                    pa,
+                    {
+                        "topic": topic,
+                        "embedding_model": EMBEDDING_MODEL,
+                        "embedding_dim": str(dim),
+                        "collection_metadata": json.dumps(collection.metadata or {}),
+                    },
+                )
+                if output_path.suffix in _ARROW_SUFFIXES:
+                    sink = pa.OSFile(str(output_path), "wb")
+                    writer = pa.ipc.new_file(sink, schema)
+                else:
+                    writer = pa.parquet.ParquetWriter(str(output_path), schema)
+
+            # IPC file writers have no .schema, so keep our own
+            writer.write_batch(_to_record_batch(results, schema, pa))
+        completed = True
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+        # Don't leave a truncated snapshot behind
+        if not completed and output_path.exists():
+            output_path.unlink()
+
+    if writer is None:
+        raise ValueError(f"No chunks for '{topic}' in {db_path}, nothing to export")
+    return exported
+
+
+def _iter_record_batches(input_path, pa):
+    """Yield record batches and the file schema without loading the whole file"""
+    input_path = Path(input_path)
+    if input_path.suffix in _ARROW_SUFFIXES:
+        # Memory-mapped IPC: batches reference the mapped file directly
+        reader = pa.ipc.open_file(pa.memory_map(str(input_path), "r"))
+        for i in range(reader.num_record_batches):
+            yield reader.schema, reader.get_batch(i)
+    else:
+        parquet_file = pa.parquet.ParquetFile(str(input_path), memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=BATCH_SIZE):
+            yield parquet_file.schema_arrow, batch
+
+
+def _read_batch(batch, metadata_keys, dim):
+    """ids, documents, metadatas and an (n, dim) float32 array of one record batch"""
+    # Fixed-size list values are one contiguous float32 buffer
+    embeddings = batch.column("embedding").values.to_numpy(
+        zero_copy_only=True
+    ).reshape(-1, dim)
+    ids = batch.column("id").to_pylist()
+    documents = batch.column("document").to_pylist()
+    metadata_columns = {key: batch.column(key).to_pylist() for key in metadata_keys}
+    extras = batch.column("extra_metadata").to_pylist()
+
+    metadatas = []
+    for i in range(batch.num_rows):
+        metadata = {
+            key: values[i]
+            for key, values in metadata_columns.items()
+            if values[i] is not None
+        }
+        if extras[i]:
+            metadata.update(json.loads(extras[i]))
+        metadatas.append(metadata)
+    return ids, documents, metadatas, embeddings
+
+
+def import_topic(input_path, topic=None, db_path=None, collection_name=DEFAULT_COLLECTION_NAME):
+    """Bulk-load an exported topic without re-embedding.
+
+    By default the chunks go into the shared store and the topic's videos
+    into its topic index; chunks already stored are not duplicated. With
+    `db_path` they go into a fresh per-topic database instead.
+    Returns (imported rows, database path).
+    """
+    pa = _import_pyarrow()
+    import numpy as np
+
+    batches = _iter_record_batches(input_path, pa)
+    first = next(batches, None)
+    if first is None:
+        raise ValueError(f"{input_path} contains no rows")
+    schema, _ = first
+
+    file_metadata = {
+        key.decode(): value.decode()
+        for key, value in (schema.metadata or {}).items()
+    }
+    topic = topic or file_metadata.get("topic")
+    if not topic:
+        raise ValueError("Topic is not stored in the file, please pass one")
+
+    if db_path is None:
+        from shared_store import SHARED_DB_PATH, SharedKnowledgeBase
+
+        knowledge_base = SharedKnowledgeBase(embedding_function=None)
+        target_path = SHARED_DB_PATH
+    else:
+        if os.path.exists(db_path) and os.listdir(db_path):
+            raise FileExistsError(f"{db_path} already exists, import needs a fresh location")
+        collection_metadata = json.loads(file_metadata.get("collection_metadata") or "{}")
+        client, collection = _open_collection(
+            db_path, collection_name, create=True, metadata=collection_metadata
+        )
+        max_batch_size = client.get_max_batch_size()
+        target_path = db_path
+
+    metadata_keys = [name for name in schema.names if name not in _RESERVED_COLUMNS]
+    dim = schema.field("embedding").type.list_size
+    imported = 0
+
+    def _batches():
+        yield first
+        yield from batches
+
+    for _, batch in _batches():
+        ids, documents, metadatas, embeddings = _read_batch(batch, metadata_keys, dim)
+        if db_path is None:
+            knowledge_base.add_embedded_chunks(topic, documents, metadatas, embeddings)
+        else:
+            for start in range(0, batch.num_rows, max_batch_size):
+                end = start + max_batch_size
+                collection.add(
+                    ids=ids[start:end],
+                    embeddings=np.asarray(embeddings[start:end]),
+                    documents=documents[start:end],
+                    metadatas=metadatas[start:end],
+                )
+        imported += batch.num_rows
+
+    return imported, target_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import a topic knowledge base")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write a topic to a Parquet/Arrow file")
+    export_parser.add_argument("topic")
+    export_parser.add_argument("output")
+    export_parser.add_argument("--db-path", help="Export a per-topic database directory instead of the topic's default")
+
+    import_parser = subparsers.add_parser("import", help="Load a Parquet/Arrow file into the shared store")
+    import_parser.add_argument("topic", nargs="?", help="Defaults to the topic stored in the file")
+    import_parser.add_argument("input")
+    import_parser.add_argument("--db-path", help="Import into a new per-topic database here instead of the shared store")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        count = export_topic(args.topic, args.output, db_path=args.db_path)
+        print(f"✅ Exported {count} chunks to {args.output}")
+    else:
+        count, db_path = import_topic(args.input, topic=args.topic, db_path=args.db_path)
+        print(f"✅ Imported {count} chunks into {db_path}")
+
+
+if __name__ == "__main__":
+    main()
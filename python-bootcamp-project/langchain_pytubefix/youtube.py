@@ -2,7 +2,26 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Generator, List, Optional, Sequence, Union
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import threading
+
+import time
+
+from collections import OrderedDict, deque
+
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from enum import Enum
 
@@ -76,14 +95,14 @@ class YoutubeLoaderFix(BaseLoader):
         return cls(video_id, **kwargs)
 
     def _make_chunk_document(
-        self, chunk_pieces: List[Dict], chunk_start_seconds: int
+        self, chunk_pieces: List[Any], chunk_start_seconds: int
     ) -> Document:
         """Create Document from chunk of transcript pieces."""
         m, s = divmod(chunk_start_seconds, 60)
         h, m = divmod(m, 60)
         return Document(
             page_content=" ".join(
-                map(lambda chunk_piece: chunk_piece["text"].strip(" "), chunk_pieces)
+                _piece_value(chunk_piece, "text").strip(" ") for chunk_piece in chunk_pieces
             ),
             metadata={
                 **self._metadata,
@@ -97,13 +116,15 @@ class YoutubeLoaderFix(BaseLoader):
         )
 
     def _get_transcript_chunks(
-        self, transcript_pieces: List[Dict]
+        self, transcript_pieces: List[Any]
     ) -> Generator[Document, None, None]:
-        chunk_pieces: List[Dict[str, Any]] = []
+        chunk_pieces: List[Any] = []
         chunk_start_seconds = 0
         chunk_time_limit = self.chunk_size_seconds
         for transcript_piece in transcript_pieces:
-            piece_end = transcript_piece["start"] + transcript_piece["duration"]
+            piece_end = _piece_value(transcript_piece, "start") + _piece_value(
+                transcript_piece, "duration"
+            )
             if piece_end > chunk_time_limit:
                 if chunk_pieces:
                     yield self._make_chunk_document(chunk_pieces, chunk_start_seconds)
@@ -116,8 +137,12 @@ class YoutubeLoaderFix(BaseLoader):
         if len(chunk_pieces) > 0:
             yield self._make_chunk_document(chunk_pieces, chunk_start_seconds)
 
-    def load(self) -> List[Document]:
-        """Load YouTube transcripts into `Document` objects."""
+    def _fetch_transcript_pieces(self) -> Optional[List[Any]]:
+        """Fetch the raw transcript pieces, or None if transcripts are disabled.
+
+        This is the network-bound half of loading; `_iter_documents` turns the
+        pieces into `Document` objects without any further I/O.
+        """
         try:
             from youtube_transcript_api import (
                 NoTranscriptFound,
@@ -139,7 +164,7 @@ class YoutubeLoaderFix(BaseLoader):
         try:
             transcript_list = YouTubeTranscriptApi.list_transcripts(self.video_id)
         except TranscriptsDisabled:
-            return []
+            return None
 
         try:
             transcript = transcript_list.find_transcript(self.language)
@@ -149,62 +174,41 @@ class YoutubeLoaderFix(BaseLoader):
         if self.translation is not None:
             transcript = transcript.translate(self.translation)
 
-        transcript_pieces: List[Dict[str, Any]] = transcript.fetch()
+        return list(transcript.fetch())
 
+    def _iter_documents(self, transcript_pieces: List[Any]) -> Iterator[Document]:
+        """Yield `Document` objects for already fetched transcript pieces."""
         if self.transcript_format == TranscriptFormat.TEXT:
-            # * FIX: New pytubefix version has transcript_piece.text instead of transcript_piece["text"]
-            try: 
-                transcript = " ".join(
-                    map(
-                        lambda transcript_piece: transcript_piece.text.strip(" "),
-                        transcript_pieces,
-                    )
-                )
-            except:
-                transcript = " ".join(
-                    map(
-                        lambda transcript_piece: transcript_piece["text"].strip(" "),
-                        transcript_pieces,
-                    )
-                )
-            return [Document(page_content=transcript, metadata=self._metadata)]
+            transcript = " ".join(
+                _piece_value(transcript_piece, "text").strip(" ")
+                for transcript_piece in transcript_pieces
+            )
+            yield Document(page_content=transcript, metadata=self._metadata)
         elif self.transcript_format == TranscriptFormat.LINES:
-            
-            try:
-                transcript = list(
-                    map(
-                        lambda transcript_piece: Document(
-                            page_content=transcript_piece.text.strip(" "),
-                            metadata=dict(
-                                filter(
-                                    lambda item: item[0] != "text", transcript_piece.items()
-                                )
-                            ),
-                        ),
-                        transcript_pieces,
-                    )
+            for transcript_piece in transcript_pieces:
+                yield Document(
+                    page_content=_piece_value(transcript_piece, "text").strip(" "),
+                    metadata={
+                        key: _piece_value(transcript_piece, key)
+                        for key in ("start", "duration")
+                    },
                 )
-            except:
-                transcript = list(
-                    map(
-                        lambda transcript_piece: Document(
-                            page_content=transcript_piece["text"].strip(" "),
-                            metadata=dict(
-                                filter(
-                                    lambda item: item[0] != "text", transcript_piece.items()
-                                )
-                            ),
-                        ),
-                        transcript_pieces,
-                    )
-                )            
-            return transcript
         elif self.transcript_format == TranscriptFormat.CHUNKS:
-            return list(self._get_transcript_chunks(transcript_pieces))
-
+            yield from self._get_transcript_chunks(transcript_pieces)
         else:
             raise ValueError("Unknown transcript format.")
 
+    def lazy_load(self) -> Iterator[Document]:
+        """Lazily load YouTube transcripts into `Document` objects."""
+        transcript_pieces = self._fetch_transcript_pieces()
+        if transcript_pieces is None:
+            return
+        yield from self._iter_documents(transcript_pieces)
+
+    def load(self) -> List[Document]:
+        """Load YouTube transcripts into `Document` objects."""
+        return list(self.lazy_load())
+
     def _get_video_info(self) -> Dict:
         """Get important video information.
 
@@ -215,33 +219,238 @@ class YoutubeLoaderFix(BaseLoader):
             - publish_date
             - channel author
             - and more.
+
+        Results are served from `VIDEO_INFO_CACHE` when a fresh entry exists.
         """
+        return get_video_info(self.video_id)
+
+
+class YoutubeMultiLoaderFix(BaseLoader):
+    """Lazily load transcripts for many `YouTube` videos.
+
+    Transcripts are fetched in a background thread pool, at most
+    `prefetch` videos ahead of the consumer, while documents are yielded in
+    the order of the given loaders. Memory stays bounded by the prefetch
+    window rather than by the total number of videos.
+    """
+
+    def __init__(
+        self,
+        loaders: Iterable[YoutubeLoaderFix],
+        max_workers: int = 4,
+        prefetch: Optional[int] = None,
+    ):
+        """Initialize with per-video loaders."""
+        self.loaders = list(loaders)
+        self.max_workers = max_workers
+        self.prefetch = prefetch if prefetch is not None else max_workers
+
+    @classmethod
+    def from_youtube_urls(
+        cls,
+        youtube_urls: Iterable[str],
+        max_workers: int = 4,
+        prefetch: Optional[int] = None,
+        **kwargs: Any,
+    ) -> YoutubeMultiLoaderFix:
+        """Given YouTube URLs, construct a loader over all of them.
+        Keyword arguments are passed to `YoutubeLoaderFix.from_youtube_url`.
+        """
+        loaders = [
+            YoutubeLoaderFix.from_youtube_url(url, **kwargs) for url in youtube_urls
+        ]
+        return cls(loaders, max_workers=max_workers, prefetch=prefetch)
+
+    def _fetch(self, loader: YoutubeLoaderFix) -> Optional[List[Any]]:
         try:
-            from pytubefix import YouTube
+            return loader._fetch_transcript_pieces()
+        except Exception:
+            if loader.continue_on_failure:
+                return None
+            raise
+
+    def lazy_load(self) -> Iterator[Document]:
+        """Yield documents video by video while later transcripts download."""
+        window = max(1, self.prefetch)
+        pending: deque[tuple[YoutubeLoaderFix, Future]] = deque()
+        loaders = iter(self.loaders)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                for loader in loaders:
+                    pending.append((loader, executor.submit(self._fetch, loader)))
+                    if len(pending) >= window:
+                        break
+                while pending:
+                    loader, future = pending.popleft()
+                    next_loader = next(loaders, None)
+                    if next_loader is not None:
+                        pending.append(
+                            (next_loader, executor.submit(self._fetch, next_loader))
+                        )
+                    transcript_pieces = future.result()
+                    if transcript_pieces is None:
+                        continue
+                    yield from loader._iter_documents(transcript_pieces)
+            finally:
+                for _, future in pending:
+                    future.cancel()
 
-        except ImportError:
-            raise ImportError(
-                'Could not import "pytubefix" Python package. '
-                "Please install it with `pip install pytubefix`."
-            )
-        yt = YouTube(
-            url=f"https://www.youtube.com/watch?v={self.video_id}", 
-            client='WEB',
+    def load(self) -> List[Document]:
+        """Load transcripts of all videos into `Document` objects."""
+        return list(self.lazy_load())
+
+
+class VideoInfoCache:
+    """Thread-safe cache of video metadata keyed by video ID.
+
+    Most fields (title, description, author, ...) never change, but
+    `view_count` does, so entries are only served for `ttl_seconds` after
+    they were stored. A stale entry is still returned by `get_stale` as a
+    fallback when refreshing it fails. The least recently used entries are
+    evicted beyond `max_entries`.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = 3600, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, Dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        """Return a fresh copy of the cached info, or None."""
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None:
+                return None
+            stored_at, video_info = entry
+            if (
+                self.ttl_seconds is not None
+                and time.monotonic() - stored_at > self.ttl_seconds
+            ):
+                return None
+            self._entries.move_to_end(video_id)
+            return dict(video_info)
+
+    def get_stale(self, video_id: str) -> Optional[Dict]:
+        """Return the cached info regardless of its age, or None."""
+        with self._lock:
+            entry = self._entries.get(video_id)
+            return dict(entry[1]) if entry is not None else None
+
+    def put(self, video_id: str, video_info: Dict) -> None:
+        """Store video info, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[video_id] = (time.monotonic(), dict(video_info))
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by the loaders and `get_video_info(s)` in this package. The Streamlit
+# app reads metadata from the YouTube Data API and transcripts from
+# youtube_transcript_api directly, so it neither fills nor reads this cache.
+VIDEO_INFO_CACHE = VideoInfoCache()
+
+
+def _fetch_video_info(video_id: str) -> Dict:
+    """Fetch video information from the watch page with `pytubefix`."""
+    try:
+        from pytubefix import YouTube
+
+    except ImportError:
+        raise ImportError(
+            'Could not import "pytubefix" Python package. '
+            "Please install it with `pip install pytubefix`."
         )
-        video_info = {
-            "title": yt.title or "Unknown",
-            "description": yt.description or "Unknown",
-            "view_count": yt.views or 0,
-            "thumbnail_url": yt.thumbnail_url or "Unknown",
-            "publish_date": yt.publish_date.strftime("%Y-%m-%d %H:%M:%S")
-            if yt.publish_date
-            else "Unknown",
-            "length": yt.length or 0,
-            "author": yt.author or "Unknown",
-        }
+    yt = YouTube(
+        url=f"https://www.youtube.com/watch?v={video_id}",
+        client='WEB',
+    )
+    video_info = {
+        "title": yt.title or "Unknown",
+        "description": yt.description or "Unknown",
+        "view_count": yt.views or 0,
+        "thumbnail_url": yt.thumbnail_url or "Unknown",
+        "publish_date": yt.publish_date.strftime("%Y-%m-%d %H:%M:%S")
+        if yt.publish_date
+        else "Unknown",
+        "length": yt.length or 0,
+        "author": yt.author or "Unknown",
+    }
+    return video_info
+
+
+def get_video_info(video_id: str, cache: Optional[VideoInfoCache] = None) -> Dict:
+    """Get video information for one video, using the cache when fresh."""
+    cache = cache if cache is not None else VIDEO_INFO_CACHE
+    video_info = cache.get(video_id)
+    if video_info is not None:
         return video_info
-    
-    
+    return _refresh_video_info(video_id, cache)
+
+
+def _refresh_video_info(video_id: str, cache: VideoInfoCache) -> Dict:
+    """Fetch and cache video information, falling back to a stale entry."""
+    try:
+        video_info = _fetch_video_info(video_id)
+    except Exception:
+        stale_info = cache.get_stale(video_id)
+        if stale_info is None:
+            raise
+        return stale_info
+    cache.put(video_id, video_info)
+    return dict(video_info)
+
+
+def get_video_infos(
+    video_ids: Iterable[str],
+    max_workers: int = 8,
+    cache: Optional[VideoInfoCache] = None,
+) -> Dict[str, Dict]:
+    """Get video information for many videos at once.
+
+    Cached entries are returned directly and the remaining page fetches run
+    concurrently in a thread pool. Videos whose lookup fails are omitted.
+    """
+    cache = cache if cache is not None else VIDEO_INFO_CACHE
+    video_infos: Dict[str, Dict] = {}
+    missing: List[str] = []
+    for video_id in dict.fromkeys(video_ids):
+        video_info = cache.get(video_id)
+        if video_info is not None:
+            video_infos[video_id] = video_info
+        else:
+            missing.append(video_id)
+
+    if missing:
+        workers = max(1, min(max_workers, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                video_id: executor.submit(_refresh_video_info, video_id, cache)
+                for video_id in missing
+            }
+            for video_id, future in futures.items():
+                try:
+                    video_infos[video_id] = future.result()
+                except Exception:
+                    continue
+    return video_infos
+
+
+def _piece_value(transcript_piece: Any, key: str) -> Any:
+    """Read a field from a transcript piece.
+
+    Newer `youtube_transcript_api` versions return snippet objects with
+    attributes instead of dicts.
+    """
+    if isinstance(transcript_piece, dict):
+        return transcript_piece[key]
+    return getattr(transcript_piece, key)
+
 
 def _parse_video_id(url: str) -> Optional[str]:
     """Parse a YouTube URL and return the video ID if valid, otherwise None."""
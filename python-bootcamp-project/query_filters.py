@@ -0,0 +1,202 @@
+# METADATA FILTERS
+# Chunk metadata carries numeric fields (duration_seconds, published_ts,
+# view_count) next to channel. Questions like "what did Matt Pocock say about
+# MCP in videos after 2024?" are parsed into a Chroma `where` clause, so the
+# similarity search only ranks chunks that can match instead of hoping they
+# show up in the top k.
+#
+#   parse_query_filters("MCP servers from AI LABS after 2024", channels=["AI LABS"])
+#   → ({"$and": [{"channel": {"$eq": "AI LABS"}}, {"published_ts": {"$gte": 1735689600}}]},
+#      "MCP servers")
+
+import calendar
+import re
+import time
+from datetime import datetime, timezone
+
+_UNIT_SECONDS = {
+    "second": 1, "sec": 1, "s": 1,
+    "minute": 60, "min": 60,
+    "hour": 3600, "hr": 3600, "h": 3600,
+    "day": 86400, "week": 7 * 86400, "month": 30 * 86400, "year": 365 * 86400,
+}
+_MULTIPLIERS = {"k": 1_000, "thousand": 1_000, "m": 1_000_000, "million": 1_000_000}
+
+_NUMBER = r"(\d+(?:[.,]\d+)*)"
+# "in videos", "from the tutorials" … in front of a filter phrase is removed with it
+_VIDEOS = r"(?:(?:in|from|among)\s+(?:the\s+)?)?(?:(?:videos?|ones?|content|tutorials?)\s+)?"
+
+_YEAR_PATTERNS = [
+    # "after 2024" = 2025 onwards; "since/from 2024 (on)" includes 2024
+    (re.compile(rf"\b{_VIDEOS}(?:published\s+|released\s+|posted\s+|uploaded\s+)?after\s+(20\d{{2}})\b", re.I), "after"),
+    (re.compile(rf"\b{_VIDEOS}(?:published\s+|released\s+|posted\s+|uploaded\s+)?(?:since|from)\s+(20\d{{2}})(?:\s+onwards?)?\b", re.I), "since"),
+    (re.compile(rf"\b{_VIDEOS}(?:published\s+|released\s+|posted\s+|uploaded\s+)?before\s+(20\d{{2}})\b", re.I), "before"),
+    (re.compile(rf"\b{_VIDEOS}(?:published\s+|released\s+|posted\s+|uploaded\s+)?(?:in|during)\s+(20\d{{2}})\b", re.I), "in"),
+]
+_RECENT_PATTERN = re.compile(
+    rf"\b{_VIDEOS}(?:from|in)\s+the\s+(?:last|past)\s+(?:(\d+)\s+)?(day|week|month|year)s?\b", re.I
+)
+# No bare "m" unit: "over 1m" is far more often a count ("over 1m views") than minutes
+_DURATION_PATTERN = re.compile(
+    rf"\b{_VIDEOS}(?:that\s+are\s+|which\s+are\s+)?(under|less\s+than|shorter\s+than|below|over|more\s+than|longer\s+than|above|at\s+least)\s+"
+    rf"{_NUMBER}\s*(hours?|hrs?|h|minutes?|mins?|seconds?|secs?|s)\b(?!\s+views)(?:\s+long)?",
+    re.I,
+)
+_VIEWS_PATTERN = re.compile(
+    rf"\b{_VIDEOS}(?:with\s+)?(over|more\s+than|at\s+least|above|under|less\s+than|fewer\s+than|below)\s+"
+    rf"{_NUMBER}\s*(k|thousand|m|million)?\s+views\b",
+    re.I,
+)
+_LOWER_BOUND = {"over", "more than", "longer than", "above", "at least"}
+
+
+# NORMALIZED METADATA
+def duration_seconds(value):
+    """Seconds from an ISO 8601 duration (PT4M13S) or a display string (4:13, 1:02:03)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = (value or "").strip()
+    match = re.fullmatch(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", value)
+    if match and value != "PT":
+        hours, minutes, seconds = (int(group) if group else 0 for group in match.groups())
+        return hours * 3600 + minutes * 60 + seconds
+    if re.fullmatch(r"\d+(?::\d{1,2}){1,2}", value):
+        seconds = 0
+        for part in value.split(":"):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    return None
+
+
+def published_timestamp(value):
+    """Epoch seconds (UTC) from a publish date like 2024-05-01T10:00:00Z or 2024-05-01 10:00:00"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = (value or "").strip()
+    for fmt in ("%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return calendar.timegm(time.strptime(value, fmt))
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_metadata(metadata):
+    """Chunk metadata with the numeric fields that filters use.
+
+    `duration_seconds` and `published_ts` are derived from the display
+    fields when missing; fields that can't be parsed are left out rather
+    than stored as 0, so range filters don't match unknown values.
+    """
+    metadata = dict(metadata)
+    if "duration_seconds" not in metadata:
+        seconds = duration_seconds(metadata.get("duration_iso") or metadata.get("duration"))
+        if seconds:
+            metadata["duration_seconds"] = seconds
+    if "published_ts" not in metadata:
+        timestamp = published_timestamp(metadata.get("published_at"))
+        if timestamp is not None:
+            metadata["published_ts"] = timestamp
+    if "view_count" in metadata:
+        metadata["view_count"] = int(metadata["view_count"] or 0)
+    # Chroma only stores str/int/float/bool values
+    return {key: value for key, value in metadata.items() if value is not None}
+
+
+# QUERY PARSING
+def _number(text, multiplier=None):
+    """"1,500" → 1500, "1.5" with "m" → 1500000"""
+    return int(float(text.replace(",", "")) * _MULTIPLIERS.get((multiplier or "").lower(), 1))
+
+
+def _year_start(year):
+    return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _strip(query, match):
+    return query[:match.start()] + " " + query[match.end():]
+
+
+def parse_query_filters(query, channels=(), now=None):
+    """Pull metadata filters out of a question.
+
+    Returns (where, search_query): a Chroma `where` clause or None, and the
+    question with the filter phrases removed so they don't skew the
+    embedding. `channels` are the channel names stored for the topic; a
+    channel filter is only added for those names, and only where the
+    question attributes something to them ("from AI LABS", "by the channel
+    AI LABS"). A bare mention stays part of the search query.
+    """
+    conditions = []
+    search_query = query
+
+    # Longest names first, so "from AI LABS Pro" is not also read as "AI LABS"
+    mentioned = []
+    for channel in sorted((c for c in channels if c), key=len, reverse=True):
+        pattern = re.compile(
+            rf"\b(?:from|by)\s+(?:the\s+)?(?:channel\s+)?(?<!\w){re.escape(channel)}(?!\w)(?:\s+channel\b)?",
+            re.I,
+        )
+        if pattern.search(search_query):
+            mentioned.append(channel)
+            search_query = pattern.sub(" ", search_query)
+    if mentioned:
+        conditions.append(
+            {"channel": {"$eq": mentioned[0]}} if len(mentioned) == 1 else {"channel": {"$in": mentioned}}
+        )
+
+    for pattern, kind in _YEAR_PATTERNS:
+        match = pattern.search(search_query)
+        if not match:
+            continue
+        year = int(match.group(1))
+        if kind == "after":
+            conditions.append({"published_ts": {"$gte": _year_start(year + 1)}})
+        elif kind == "since":
+            conditions.append({"published_ts": {"$gte": _year_start(year)}})
+        elif kind == "before":
+            conditions.append({"published_ts": {"$lt": _year_start(year)}})
+        else:
+            conditions.append({"published_ts": {"$gte": _year_start(year)}})
+            conditions.append({"published_ts": {"$lt": _year_start(year + 1)}})
+        search_query = _strip(search_query, match)
+
+    match = _RECENT_PATTERN.search(search_query)
+    if match:
+        count, unit = int(match.group(1) or 1), match.group(2).lower()
+        now = now if now is not None else time.time()
+        conditions.append({"published_ts": {"$gte": int(now - count * _UNIT_SECONDS[unit])}})
+        search_query = _strip(search_query, match)
+
+    # Views before durations, so "over 1m views" is never read as a length
+    match = _VIEWS_PATTERN.search(search_query)
+    if match:
+        comparison, amount, multiplier = match.groups()
+        operator = "$gte" if " ".join(comparison.lower().split()) in _LOWER_BOUND else "$lte"
+        conditions.append({"view_count": {operator: _number(amount, multiplier)}})
+        search_query = _strip(search_query, match)
+
+    match = _DURATION_PATTERN.search(search_query)
+    if match:
+        comparison, amount, unit = match.groups()
+        unit = unit.lower().rstrip("s") or "s"
+        seconds = _number(amount) * _UNIT_SECONDS[unit]
+        operator = "$gte" if " ".join(comparison.lower().split()) in _LOWER_BOUND else "$lte"
+        conditions.append({"duration_seconds": {operator: seconds}})
+        search_query = _strip(search_query, match)
+
+    search_query = re.sub(r"\s+([?.!,])", r"\1", " ".join(search_query.split())).strip(" ,")
+    if not conditions:
+        return None, query
+    where = conditions[0] if len(conditions) == 1 else {"$and": conditions}
+    return where, search_query or query
+
+
+def stored_channels(vectorstore):
+    """Channel names of the chunks in a vector store (Chroma or a shared-store TopicView)"""
+    if hasattr(vectorstore, "get_metadatas"):
+        metadatas = vectorstore.get_metadatas()
+    else:
+        metadatas = vectorstore._collection.get(include=["metadatas"])["metadatas"]
+    channels = {metadata.get("channel") for metadata in metadatas if metadata}
+    return sorted(c for c in channels if c and c != "Unknown")
@@ -0,0 +1,125 @@
+# RAG CHAIN
+# History-aware retrieval chain shared by the Streamlit app and the async
+# service. Kept free of Streamlit so it can be built outside a script run.
+
+from typing import Any, List
+
+from langchain_core.documents import Document
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.retrievers import BaseRetriever
+from langchain.chains import create_history_aware_retriever, create_retrieval_chain
+from langchain.chains.combine_documents import create_stuff_documents_chain
+
+from query_filters import parse_query_filters
+
+
+class ScoredRetriever(BaseRetriever):
+    """Similarity search that keeps each match's distance in metadata['score'].
+
+    Filters named in the question (channel, publish date, duration, views)
+    become a `where` clause, so only matching chunks are ranked. If nothing
+    matches, e.g. in a database built before those fields were stored, the
+    unfiltered search is used instead.
+    """
+
+    vectorstore: Any
+    k: int = 3
+    channels: List[str] = []
+    parse_filters: bool = True
+
+    @staticmethod
+    def _with_scores(results) -> List[Document]:
+        return [
+            Document(page_content=doc.page_content, metadata={**doc.metadata, "score": score})
+            for doc, score in results
+        ]
+
+    def _search_args(self, query):
+        # Topic scoping is added by the vector store itself (TopicView._merge)
+        where, search_query = (
+            parse_query_filters(query, self.channels) if self.parse_filters else (None, query)
+        )
+        return search_query, where
+
+    def _get_relevant_documents(self, query, *, run_manager) -> List[Document]:
+        search_query, where = self._search_args(query)
+        results = self.vectorstore.similarity_search_with_score(search_query, k=self.k, filter=where)
+        if where and not results:
+            results = self.vectorstore.similarity_search_with_score(query, k=self.k)
+        return self._with_scores(results)
+
+    async def _aget_relevant_documents(self, query, *, run_manager) -> List[Document]:
+        search_query, where = self._search_args(query)
+        results = await self.vectorstore.asimilarity_search_with_score(search_query, k=self.k, filter=where)
+        if where and not results:
+            results = await self.vectorstore.asimilarity_search_with_score(query, k=self.k)
+        return self._with_scores(results)
+
+
+def build_rag_chain(llm, vectorstore, topic, k=3, channels=()):
+    """Create history-aware RAG chain over a vector store.
+
+    `channels` are the channel names in the store, for "from <channel>" filters.
+    """
+    retriever = ScoredRetriever(vectorstore=vectorstore, k=k, channels=list(channels))
+
+    # STAGE 1: History-aware question contextualization
+    contextualize_q_system_prompt = f"""Given a chat history and the latest user question \
+which might reference context in the chat history, formulate a standalone question \
+which can be understood without the chat history. Do NOT answer the question, \
+just reformulate it if needed and otherwise return it as is.
+
+Focus on {topic} concepts and YouTube video content."""
+
+    contextualize_q_prompt = ChatPromptTemplate.from_messages([
+        ("system", contextualize_q_system_prompt),
+        MessagesPlaceholder("chat_history"),
+        ("human", "{input}"),
+    ])
+
+    # Create history-aware retriever
+    history_aware_retriever = create_history_aware_retriever(
+        llm, retriever, contextualize_q_prompt
+    )
+
+    # STAGE 2: Answer generation with context and history
+    qa_system_prompt = f"""You are an expert YouTube Channel Agent with access to a curated database of {topic} videos.
+
+You have access to full video transcripts and complete metadata for each source. The context includes both the video content and all available metadata about each video source.
+
+When answering questions, you can reference any information available in the context, including video content, metadata, and source details. Use this information to provide comprehensive, accurate responses.
+
+ALWAYS draw from the video content and source metadata in your responses. Use all available information from the context to give specific, detailed answers.
+
+Context from videos:
+{{context}}"""
+
+    qa_prompt = ChatPromptTemplate.from_messages([
+        ("system", qa_system_prompt),
+        MessagesPlaceholder("chat_history"),
+        ("human", "{input}")
+    ])
+
+    # Create question-answer chain
+    question_answer_chain = create_stuff_documents_chain(llm, qa_prompt)
+
+    # Combine into full RAG chain
+    return create_retrieval_chain(history_aware_retriever, question_answer_chain)
+
+
+def format_sources(context):
+    """Markdown list of unique source videos for retrieved documents"""
+    if not context:
+        return None
+    sources_seen = set()
+    sources_text = "**📚 Sources Used:**\n"
+    for doc in context:
+        title = doc.metadata.get('title', 'Unknown')
+        channel = doc.metadata.get('channel', 'Unknown')
+        url = doc.metadata.get('url', '#')
+
+        source_key = f"{title}|{channel}"
+        if source_key not in sources_seen:
+            sources_text += f"- **{title}** by {channel} - [🔗 Watch]({url})\n"
+            sources_seen.add(source_key)
+    return sources_text
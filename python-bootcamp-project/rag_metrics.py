@@ -0,0 +1,408 @@
+# RAG METRICS
+# Per-stage timings, token counts, cache hit rates and retrieval scores for
+# chat requests and knowledge base builds.
+#
+# - RAGTraceHandler: LangChain callback that splits one chain run into
+#   contextualize (question rewrite LLM call), retrieve and generate stages
+# - BuildTrace: timers for search / transcripts / chunking / embedding
+# - MetricsRegistry: keeps recent traces, aggregates percentiles and writes
+#   every trace to a JSONL sink when one is configured
+# - start_metrics_server: optional local HTTP endpoint (/metrics, /summary,
+#   /traces/latest)
+#
+# Environment:
+#   RAG_TRACE_LOG     path of a JSONL file receiving every trace
+#   RAG_METRICS_PORT  port of the local metrics endpoint (disabled if unset)
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Run names given by langchain's retrieval chain helpers
+_GENERATE_CHAIN = "stuff_documents_chain"
+_RETRIEVER_CHAINS = {"chat_retriever_chain", "retrieve_documents"}
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# SINKS
+class JsonlSink:
+    """Append traces as one JSON object per line"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# REGISTRY
+class MetricsRegistry:
+    """Aggregates traces in bounded memory.
+
+    The latest trace per session (for the debug panel) is kept for at most
+    `max_sessions` sessions, least recently active first out, and dropped
+    once a session has been idle for `session_ttl_seconds`.
+    """
+
+    def __init__(self, sink=None, window=1000, max_sessions=1000, session_ttl_seconds=3600):
+        self.sink = sink
+        self.window = window
+        self.max_sessions = max_sessions
+        self.session_ttl_seconds = session_ttl_seconds
+        self._lock = threading.Lock()
+        self._stage_ms = defaultdict(lambda: deque(maxlen=window))
+        self._counters = defaultdict(int)
+        # session_id -> (monotonic time recorded, trace), oldest first
+        self._latest = OrderedDict()
+        self._latest_any = None
+        self._latest_build = None
+        self._caches = {}
+
+    def register_cache(self, name, stats_fn):
+        """Report hit rates of a cache; stats_fn returns {'hits': n, 'misses': m}"""
+        self._caches[name] = stats_fn
+
+    def cache_stats(self):
+        stats = {}
+        for name, stats_fn in self._caches.items():
+            counts = stats_fn()
+            lookups = counts.get("hits", 0) + counts.get("misses", 0)
+            stats[name] = {
+                **counts,
+                "hit_rate": counts.get("hits", 0) / lookups if lookups else None,
+            }
+        return stats
+
+    def _emit(self, record):
+        if self.sink is not None:
+            try:
+                self.sink.write(record)
+            except OSError:
+                # Metrics must never break a chat request
+                pass
+
+    def record(self, trace):
+        """Store a finished chat trace"""
+        with self._lock:
+            self._counters["requests"] += 1
+            if trace.get("error"):
+                self._counters["errors"] += 1
+            for stage, ms in trace["stages_ms"].items():
+                self._stage_ms[stage].append(ms)
+            for key, value in trace["tokens"].items():
+                self._counters[f"tokens_{key}"] += value
+            session_id = trace.get("session_id")
+            if session_id is not None:
+                self._latest[session_id] = (time.monotonic(), trace)
+                self._latest.move_to_end(session_id)
+                self._evict_sessions()
+            self._latest_any = trace
+        self._emit({"type": "chat", **trace})
+
+    def _evict_sessions(self):
+        """Drop expired and least recently active sessions (lock held)"""
+        expired_before = time.monotonic() - self.session_ttl_seconds
+        while self._latest:
+            session_id, (recorded_at, _) = next(iter(self._latest.items()))
+            if len(self._latest) <= self.max_sessions and recorded_at >= expired_before:
+                break
+            del self._latest[session_id]
+
+    def forget_session(self, session_id):
+        with self._lock:
+            self._latest.pop(session_id, None)
+
+    def record_build(self, trace):
+        """Store a finished knowledge base build trace"""
+        with self._lock:
+            self._counters["builds"] += 1
+            for stage, ms in trace["stages_ms"].items():
+                self._stage_ms[f"build_{stage}"].append(ms)
+            self._latest_build = trace
+        self._emit({"type": "build", **trace})
+
+    def latest(self, session_id=None):
+        """Latest trace of a session, or of the whole process without one"""
+        with self._lock:
+            if session_id is None:
+                return self._latest_any
+            self._evict_sessions()
+            entry = self._latest.get(session_id)
+            return entry[1] if entry else None
+
+    def latest_build(self):
+        with self._lock:
+            return self._latest_build
+
+    def summary(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": len(values),
+                    "p50_ms": _percentile(values, 0.5),
+                    "p95_ms": _percentile(values, 0.95),
+                    "p99_ms": _percentile(values, 0.99),
+                }
+                for stage, values in self._stage_ms.items()
+            }
+            counters = dict(self._counters)
+        return {"stages": stages, "counters": counters, "caches": self.cache_stats()}
+
+    def prometheus_text(self):
+        """Summary in the Prometheus text exposition format"""
+        summary = self.summary()
+        lines = []
+        for stage, values in summary["stages"].items():
+            for quantile in ("p50", "p95", "p99"):
+                value = values[f"{quantile}_ms"]
+                if value is not None:
+                    lines.append(
+                        f'rag_stage_latency_ms{{stage="{stage}",quantile="0.{quantile[1:]}"}} {value:.3f}'
+                    )
+            lines.append(f'rag_stage_count{{stage="{stage}"}} {values["count"]}')
+        for name, value in summary["counters"].items():
+            lines.append(f"rag_{name}_total {value}")
+        for name, stats in summary["caches"].items():
+            if stats["hit_rate"] is not None:
+                lines.append(f'rag_cache_hit_rate{{cache="{name}"}} {stats["hit_rate"]:.4f}')
+        return "\n".join(lines) + "\n"
+
+
+def _default_sink():
+    path = os.environ.get("RAG_TRACE_LOG")
+    return JsonlSink(path) if path else None
+
+
+METRICS = MetricsRegistry(sink=_default_sink())
+
+
+# CHAT TRACES
+class RAGTraceHandler(BaseCallbackHandler):
+    """Collect one trace per chain run and hand it to the registry when done"""
+
+    def __init__(self, registry=None, session_id=None, topic=None):
+        self.registry = registry if registry is not None else METRICS
+        self._lock = threading.Lock()
+        self._runs = {}
+        self.trace = {
+            "started_at": _now_iso(),
+            "session_id": session_id,
+            "topic": topic,
+            "stages_ms": defaultdict(float),
+            "tokens": defaultdict(int),
+            "llm_calls": 0,
+            "retrieval": {},
+            "error": None,
+        }
+
+    def _stage_for(self, parent_run_id):
+        """Stage of an LLM call from the chains it runs in"""
+        while parent_run_id is not None and parent_run_id in self._runs:
+            run = self._runs[parent_run_id]
+            if run["name"] == _GENERATE_CHAIN:
+                return "generate"
+            if run["name"] in _RETRIEVER_CHAINS:
+                return "contextualize"
+            parent_run_id = run["parent"]
+        return "llm"
+
+    def _start(self, run_id, parent_run_id, name):
+        with self._lock:
+            self._runs[run_id] = {
+                "name": name,
+                "parent": parent_run_id,
+                "start": time.perf_counter(),
+            }
+
+    def _end(self, run_id):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None, None
+            elapsed_ms = (time.perf_counter() - run["start"]) * 1000
+            return run, elapsed_ms
+
+    def _finish(self, elapsed_ms):
+        trace = self.trace
+        trace["stages_ms"]["total"] = elapsed_ms
+        trace["stages_ms"] = dict(trace["stages_ms"])
+        trace["tokens"] = dict(trace["tokens"])
+        self.registry.record(trace)
+
+    # Chains
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        self._start(run_id, parent_run_id, name)
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs):
+        run, elapsed_ms = self._end(run_id)
+        if run is None:
+            return
+        if run["name"] == _GENERATE_CHAIN:
+            self.trace["stages_ms"]["generate"] += elapsed_ms
+        if run["parent"] is None:
+            self._finish(elapsed_ms)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        run, elapsed_ms = self._end(run_id)
+        if run is not None and run["parent"] is None:
+            self.trace["error"] = repr(error)
+            self._finish(elapsed_ms)
+
+    # LLM calls
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, "llm")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, "llm")
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        run, elapsed_ms = self._end(run_id)
+        if run is None:
+            return
+        stage = self._stage_for(run["parent"])
+        tokens = self.trace["tokens"]
+        self.trace["llm_calls"] += 1
+        # The generate stage is timed by its chain; only the rewrite is an LLM-only stage
+        if stage != "generate":
+            self.trace["stages_ms"][stage] += elapsed_ms
+
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+        else:
+            prompt_tokens = completion_tokens = 0
+            for generations in response.generations:
+                for generation in generations:
+                    usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage_metadata:
+                        prompt_tokens += usage_metadata.get("input_tokens", 0)
+                        completion_tokens += usage_metadata.get("output_tokens", 0)
+        tokens[f"{stage}_prompt"] += prompt_tokens
+        tokens[f"{stage}_completion"] += completion_tokens
+        tokens["total"] += prompt_tokens + completion_tokens
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id)
+
+    # Retrieval
+    def on_retriever_start(self, serialized, query, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, "retriever")
+        self.trace["retrieval"]["query"] = query
+
+    def on_retriever_end(self, documents, *, run_id, parent_run_id=None, **kwargs):
+        run, elapsed_ms = self._end(run_id)
+        if run is None:
+            return
+        self.trace["stages_ms"]["retrieve"] += elapsed_ms
+        self.trace["retrieval"].update({
+            "documents": len(documents),
+            "scores": [doc.metadata.get("score") for doc in documents],
+            "video_ids": [doc.metadata.get("video_id") for doc in documents],
+        })
+
+    def on_retriever_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id)
+
+
+# BUILD TRACES
+class BuildTrace:
+    """Stage timers and counts for one knowledge base build"""
+
+    def __init__(self, topic, registry=None):
+        self.registry = registry if registry is not None else METRICS
+        self._start = time.perf_counter()
+        self.trace = {
+            "started_at": _now_iso(),
+            "topic": topic,
+            "stages_ms": defaultdict(float),
+            "counts": defaultdict(int),
+        }
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.trace["stages_ms"][name] += (time.perf_counter() - start) * 1000
+
+    def count(self, name, n=1):
+        self.trace["counts"][name] += n
+
+    def finish(self):
+        trace = self.trace
+        total_ms = (time.perf_counter() - self._start) * 1000
+        trace["stages_ms"]["total"] = total_ms
+        embed_ms = trace["stages_ms"].get("embed")
+        if embed_ms:
+            trace["chunks_per_second"] = trace["counts"].get("chunks", 0) / (embed_ms / 1000)
+        trace["stages_ms"] = dict(trace["stages_ms"])
+        trace["counts"] = dict(trace["counts"])
+        trace["caches"] = self.registry.cache_stats()
+        self.registry.record_build(trace)
+        return trace
+
+
+# LOCAL METRICS ENDPOINT
+def start_metrics_server(registry=None, port=None, host="127.0.0.1"):
+    """Serve metrics over HTTP from a daemon thread; returns the server or None"""
+    registry = registry if registry is not None else METRICS
+    port = port if port is not None else os.environ.get("RAG_METRICS_PORT")
+    if not port:
+        return None
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = registry.prometheus_text()
+                content_type = "text/plain; version=0.0.4"
+            elif self.path == "/summary":
+                body = json.dumps(registry.summary(), default=str)
+                content_type = "application/json"
+            elif self.path == "/traces/latest":
+                body = json.dumps(
+                    {"chat": registry.latest(), "build": registry.latest_build()},
+                    default=str,
+                )
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="rag-metrics", daemon=True).start()
+    return server
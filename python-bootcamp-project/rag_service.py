@@ -0,0 +1,271 @@
+# ASYNC RAG SERVICE
+# Runs all LLM and retrieval work on one asyncio event loop in a background
+# thread, shared by every chat session in the process. A Streamlit script
+# still waits on its own thread for the answer (RAGService.ask), but the
+# requests of all sessions run concurrently on the loop over one connection
+# pool, with chains and clients built once per process instead of per rerun.
+#
+# - One pooled httpx.AsyncClient is shared by the chat model and embeddings
+# - A global limit caps in-flight requests for the whole process
+# - A per-session limit keeps one user from starving the others
+# - Overview questions are answered from precomputed summaries (summaries.py)
+
+import asyncio
+import threading
+from collections import defaultdict
+
+from rag_chain import build_rag_chain, format_sources
+from query_filters import stored_channels
+from rag_metrics import METRICS, RAGTraceHandler
+from summaries import SummaryStore, format_overview, is_overview_question
+
+DEFAULT_CHAT_MODEL = "gpt-4o-mini"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+
+
+class RAGService:
+    def __init__(
+        self,
+        max_concurrent_requests=32,
+        per_session_limit=1,
+        max_connections=64,
+        request_timeout=120,
+        chat_model=DEFAULT_CHAT_MODEL,
+        temperature=0.7,
+        openai_base_url=None,
+        openai_api_key=None,
+        llm_factory=None,
+        embeddings_factory=None,
+        vectorstore_factory=None,
+        metrics=None,
+        summary_store=None,
+    ):
+        self.max_concurrent_requests = max_concurrent_requests
+        self.per_session_limit = per_session_limit
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+        self.chat_model = chat_model
+        self.temperature = temperature
+        # Point at any OpenAI-compatible server (e.g. the load-test stub)
+        self.openai_base_url = openai_base_url
+        self.openai_api_key = openai_api_key
+        # Factories let tests and benchmarks swap in offline models/stores
+        self._llm_factory = llm_factory or self._default_llm
+        self._embeddings_factory = embeddings_factory or self._default_embeddings
+        self._vectorstore_factory = vectorstore_factory or self._default_vectorstore
+        self.metrics = metrics if metrics is not None else METRICS
+        self.summaries = summary_store or SummaryStore()
+        self._chain_stats = {"hits": 0, "misses": 0}
+        self.metrics.register_cache("rag_chains", self.chain_stats)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="rag-service", daemon=True
+        )
+        self._thread.start()
+
+        # Everything below is only touched from the service loop
+        self._http_client = None
+        self._llm = None
+        self._embeddings = None
+        self._chains = {}
+        self._chain_locks = defaultdict(asyncio.Lock)
+        self._global_limit = None
+        self._session_limits = {}
+        self._session_users = defaultdict(int)
+
+    # CLIENTS
+    def _get_http_client(self):
+        if self._http_client is None:
+            import httpx
+
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=self.request_timeout,
+            )
+        return self._http_client
+
+    def _openai_kwargs(self):
+        kwargs = {"http_async_client": self._get_http_client()}
+        if self.openai_base_url:
+            kwargs["base_url"] = self.openai_base_url
+        if self.openai_api_key:
+            kwargs["api_key"] = self.openai_api_key
+        return kwargs
+
+    def _default_llm(self):
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            model=self.chat_model,
+            temperature=self.temperature,
+            **self._openai_kwargs(),
+        )
+
+    def _default_embeddings(self):
+        from langchain_openai import OpenAIEmbeddings
+
+        return OpenAIEmbeddings(
+            model=DEFAULT_EMBEDDING_MODEL,
+            # Compatible servers take raw strings, not tiktoken ids
+            check_embedding_ctx_length=not self.openai_base_url,
+            **self._openai_kwargs(),
+        )
+
+    def _default_vectorstore(self, topic, embeddings):
+        from shared_store import open_topic_store
+
+        vectorstore, _ = open_topic_store(topic, embeddings)
+        if vectorstore is None:
+            raise ValueError(f"No knowledge base found for '{topic}'")
+        return vectorstore
+
+    def chain_stats(self):
+        """Chain cache lookups in MetricsRegistry.register_cache form"""
+        return dict(self._chain_stats)
+
+    async def _get_chain(self, topic):
+        if topic in self._chains:
+            self._chain_stats["hits"] += 1
+            return self._chains[topic]
+        async with self._chain_locks[topic]:
+            if topic not in self._chains:
+                self._chain_stats["misses"] += 1
+                if self._llm is None:
+                    self._llm = self._llm_factory()
+                    self._embeddings = self._embeddings_factory()
+                vectorstore = self._vectorstore_factory(topic, self._embeddings)
+                channels = await asyncio.to_thread(stored_channels, vectorstore)
+                self._chains[topic] = build_rag_chain(
+                    self._llm, vectorstore, topic, channels=channels
+                )
+        return self._chains[topic]
+
+    def invalidate_topic(self, topic):
+        """Rebuild the topic's chain on its next request, e.g. after a rebuild"""
+        self._loop.call_soon_threadsafe(self._chains.pop, topic, None)
+
+    # CONCURRENCY LIMITS
+    def _acquire_slots(self, session_id):
+        if self._global_limit is None:
+            self._global_limit = asyncio.Semaphore(self.max_concurrent_requests)
+        if session_id not in self._session_limits:
+            self._session_limits[session_id] = asyncio.Semaphore(self.per_session_limit)
+        self._session_users[session_id] += 1
+        return self._session_limits[session_id]
+
+    def _release_slots(self, session_id):
+        self._session_users[session_id] -= 1
+        # Drop idle sessions so the limits don't grow with every visitor
+        if self._session_users[session_id] == 0:
+            del self._session_users[session_id]
+            del self._session_limits[session_id]
+
+    def _run_config(self, session_id, topic):
+        """Per-request callbacks that record a stage trace"""
+        handler = RAGTraceHandler(self.metrics, session_id=session_id, topic=topic)
+        return {"callbacks": [handler], "run_name": "rag_request"}
+
+    async def _answer_from_summaries(self, session_id, topic, question, chat_history):
+        """Chain-shaped output for overview questions, or None to use the RAG chain"""
+        if not is_overview_question(question, topic):
+            return None
+        topic_summary = await asyncio.to_thread(self.summaries.get_topic, topic)
+        if topic_summary is None:
+            return None
+
+        from langchain_core.documents import Document
+        from langchain_core.runnables import RunnableLambda
+
+        def respond(inputs):
+            context = [
+                Document(
+                    page_content=video["summary"],
+                    metadata={key: video[key] for key in ("video_id", "title", "channel", "url")},
+                )
+                for video in topic_summary["videos"]
+            ]
+            return {**inputs, "context": context, "answer": format_overview(topic_summary)}
+
+        # Runs as a traced request too, so the debug panel and /summary see it
+        return await RunnableLambda(respond).ainvoke(
+            {"input": question, "chat_history": list(chat_history)},
+            config=self._run_config(session_id, topic),
+        )
+
+    # ASYNC API (runs on the service loop)
+    async def ainvoke(self, session_id, topic, question, chat_history=()):
+        """Answer a question; returns the chain output dict"""
+        response = await self._answer_from_summaries(session_id, topic, question, chat_history)
+        if response is not None:
+            return response
+
+        session_limit = self._acquire_slots(session_id)
+        try:
+            async with session_limit, self._global_limit:
+                chain = await self._get_chain(topic)
+                return await chain.ainvoke(
+                    {"input": question, "chat_history": list(chat_history)},
+                    config=self._run_config(session_id, topic),
+                )
+        finally:
+            self._release_slots(session_id)
+
+    async def astream(self, session_id, topic, question, chat_history=()):
+        """Yield answer text as it is generated, then the sources markdown"""
+        response = await self._answer_from_summaries(session_id, topic, question, chat_history)
+        if response is not None:
+            yield {"answer": response["answer"]}
+            yield {"sources": format_sources(response["context"])}
+            return
+
+        session_limit = self._acquire_slots(session_id)
+        try:
+            async with session_limit, self._global_limit:
+                chain = await self._get_chain(topic)
+                context = None
+                async for chunk in chain.astream(
+                    {"input": question, "chat_history": list(chat_history)},
+                    config=self._run_config(session_id, topic),
+                ):
+                    if "context" in chunk:
+                        context = chunk["context"]
+                    if "answer" in chunk:
+                        yield {"answer": chunk["answer"]}
+                sources = format_sources(context)
+                if sources:
+                    yield {"sources": sources}
+        finally:
+            self._release_slots(session_id)
+
+    # THREAD-SAFE API (for Streamlit script threads)
+    def submit(self, session_id, topic, question, chat_history=()):
+        """Schedule a question on the service loop; returns a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(
+            self.ainvoke(session_id, topic, question, chat_history), self._loop
+        )
+
+    def ask(self, session_id, topic, question, chat_history=(), timeout=None):
+        """Answer a question and block until the response is ready"""
+        future = self.submit(session_id, topic, question, chat_history)
+        try:
+            response = future.result(timeout if timeout is not None else self.request_timeout)
+        except TimeoutError:
+            # Cancel the coroutine too, or it keeps holding the session's slot
+            future.cancel()
+            raise
+        return response['answer'], format_sources(response.get('context'))
+
+    def close(self):
+        """Close the connection pool and stop the service loop"""
+        async def _shutdown():
+            if self._http_client is not None:
+                await self._http_client.aclose()
+
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(_shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
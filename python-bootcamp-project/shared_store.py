@@ -0,0 +1,344 @@
+# SHARED KNOWLEDGE BASE
+# One global Chroma collection holds every unique chunk once, keyed by
+# (video_id, chunk hash). Topics are membership sets of video IDs in a small
+# SQLite table, and searches for a topic filter on those videos. A video that
+# shows up in several topics is embedded and stored once.
+#
+#   python shared_store.py migrate "VIBE CODING MCP DEVELOPMENT TUTORIAL"
+#   python shared_store.py stats
+#   python shared_store.py backfill "VIBE CODING MCP DEVELOPMENT TUTORIAL"
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+from query_filters import normalize_metadata, published_timestamp
+
+SHARED_DB_PATH = "data/shared_kb_db"
+TOPICS_DB_PATH = "data/shared_kb_topics.sqlite3"
+COLLECTION_NAME = "shared_chunks"
+# Rows per collection.add call, below Chroma's maximum batch size
+ADD_BATCH_SIZE = 1000
+
+
+def chroma_class():
+    """langchain's Chroma vector store class, imported on first use"""
+    try:
+        from langchain_chroma import Chroma
+    except ImportError:
+        from langchain_community.vectorstores import Chroma
+    return Chroma
+
+
+def chunk_id(video_id, text):
+    """Stable ID of a chunk: same video and same text give the same ID"""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+    return f"{video_id}:{digest}"
+
+
+# TOPIC MEMBERSHIP
+class TopicIndex:
+    """Topic → video ID sets, stored in SQLite (standard library only)"""
+
+    def __init__(self, path=TOPICS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS topic_videos ("
+            "topic TEXT NOT NULL, video_id TEXT NOT NULL, "
+            "PRIMARY KEY (topic, video_id))"
+        )
+        return conn
+
+    def add(self, topic, video_ids):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO topic_videos (topic, video_id) VALUES (?, ?)",
+                [(topic, video_id) for video_id in set(video_ids)],
+            )
+
+    def video_ids(self, topic):
+        if not os.path.exists(self.path):
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT video_id FROM topic_videos WHERE topic = ? ORDER BY video_id", (topic,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def topics(self):
+        if not os.path.exists(self.path):
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT DISTINCT topic FROM topic_videos ORDER BY topic").fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self):
+        if not os.path.exists(self.path):
+            return {"topics": 0, "memberships": 0, "videos": 0}
+        with closing(self._connect()) as conn:
+            topics, memberships, videos = conn.execute(
+                "SELECT COUNT(DISTINCT topic), COUNT(*), COUNT(DISTINCT video_id) FROM topic_videos"
+            ).fetchone()
+        return {"topics": topics, "memberships": memberships, "videos": videos}
+
+
+def list_topics(path=TOPICS_DB_PATH):
+    """Topics in the shared store; cheap enough to call on every page load"""
+    return TopicIndex(path).topics()
+
+
+# SHARED STORE
+class SharedKnowledgeBase:
+    def __init__(self, embedding_function, path=SHARED_DB_PATH, topics_path=TOPICS_DB_PATH):
+        self.embedding_function = embedding_function
+        self.path = path
+        self.topic_index = TopicIndex(topics_path)
+        self._vectorstore = None
+        # Chunks found already stored (hits) vs. added (misses), for metrics
+        self._reuse = {"hits": 0, "misses": 0}
+
+    @property
+    def vectorstore(self):
+        if self._vectorstore is None:
+            self._vectorstore = chroma_class()(
+                collection_name=COLLECTION_NAME,
+                persist_directory=self.path,
+                embedding_function=self.embedding_function,
+            )
+        return self._vectorstore
+
+    @property
+    def collection(self):
+        return self.vectorstore._collection
+
+    def _missing_ids(self, ids):
+        existing = set(self.collection.get(ids=ids, include=[])["ids"]) if ids else set()
+        missing = [i for i in ids if i not in existing]
+        self._reuse["hits"] += len(ids) - len(missing)
+        self._reuse["misses"] += len(missing)
+        return missing
+
+    def reuse_stats(self):
+        """Chunk dedup counts in MetricsRegistry.register_cache form"""
+        return dict(self._reuse)
+
+    def add_chunks(self, topic, texts, metadatas):
+        """Add a topic's chunks; only chunks not stored yet are embedded.
+
+        Returns (added, reused) chunk counts.
+        """
+        unique = {}
+        for text, metadata in zip(texts, metadatas):
+            # Membership lives in the topic index, not in shared chunk metadata
+            metadata = normalize_metadata({key: value for key, value in metadata.items() if key != "topic"})
+            unique.setdefault(chunk_id(metadata["video_id"], text), (text, metadata))
+
+        ids = list(unique)
+        new_ids = self._missing_ids(ids)
+        if new_ids:
+            self.vectorstore.add_texts(
+                texts=[unique[i][0] for i in new_ids],
+                metadatas=[unique[i][1] for i in new_ids],
+                ids=new_ids,
+            )
+        self.topic_index.add(topic, (metadata["video_id"] for _, metadata in unique.values()))
+        return len(new_ids), len(ids) - len(new_ids)
+
+    def add_embedded_chunks(self, topic, texts, metadatas, embeddings):
+        """Add chunks that already have vectors (migrations, imports); returns (added, reused)"""
+        rows = {}
+        for text, metadata, embedding in zip(texts, metadatas, embeddings):
+            metadata = normalize_metadata(
+                {key: value for key, value in (metadata or {}).items() if key != "topic"}
+            )
+            rows.setdefault(chunk_id(metadata["video_id"], text), (text, metadata, embedding))
+
+        import numpy as np
+
+        ids = list(rows)
+        new_ids = self._missing_ids(ids)
+        for start in range(0, len(new_ids), ADD_BATCH_SIZE):
+            batch = new_ids[start:start + ADD_BATCH_SIZE]
+            self.collection.add(
+                ids=batch,
+                documents=[rows[i][0] for i in batch],
+                metadatas=[rows[i][1] for i in batch],
+                # One float32 array: Chroma rejects lists of numpy scalars
+                embeddings=np.asarray([rows[i][2] for i in batch], dtype=np.float32),
+            )
+        self.topic_index.add(topic, (metadata["video_id"] for _, metadata, _ in rows.values()))
+        return len(new_ids), len(ids) - len(new_ids)
+
+    def migrate_topic_db(self, topic, db_path, collection_name="langchain"):
+        """Copy a per-topic database into the shared store, reusing its vectors"""
+        import chromadb
+
+        source = chromadb.PersistentClient(path=db_path).get_collection(collection_name)
+        stored = source.get(include=["documents", "metadatas", "embeddings"])
+        return self.add_embedded_chunks(
+            topic, stored["documents"], stored["metadatas"], stored["embeddings"]
+        )
+
+    def backfill_metadata(self, topic):
+        """Add duration_seconds, published_ts and view_count to a topic's chunks
+        that were stored without them, looking the videos up on YouTube"""
+        from langchain_pytubefix.youtube import get_video_infos
+
+        where = self.topic_view(topic).topic_filter()
+        if where is None:
+            return 0
+        stored = self.collection.get(where=where, include=["metadatas"])
+        stale = [
+            (chunk_id, metadata)
+            for chunk_id, metadata in zip(stored["ids"], stored["metadatas"])
+            if "published_ts" not in metadata or "duration_seconds" not in metadata
+        ]
+        video_infos = get_video_infos(metadata["video_id"] for _, metadata in stale)
+
+        ids, metadatas = [], []
+        for chunk_id, metadata in stale:
+            video_info = video_infos.get(metadata["video_id"])
+            if video_info is None:
+                continue
+            updated = dict(metadata)
+            if video_info.get("length"):
+                updated.setdefault("duration_seconds", int(video_info["length"]))
+            published_ts = published_timestamp(video_info.get("publish_date"))
+            if published_ts is not None:
+                updated.setdefault("published_ts", published_ts)
+            updated.setdefault("view_count", int(video_info.get("view_count") or 0))
+            ids.append(chunk_id)
+            metadatas.append(updated)
+        if ids:
+            self.collection.update(ids=ids, metadatas=metadatas)
+        return len(ids)
+
+    def has_topic(self, topic):
+        return bool(self.topic_index.video_ids(topic))
+
+    def topic_view(self, topic):
+        return TopicView(self, topic)
+
+    def stats(self):
+        return {
+            "unique_chunks": self.collection.count(),
+            **self.topic_index.stats(),
+        }
+
+
+class TopicView:
+    """One topic of the shared store, searched like a per-topic vector store.
+
+    Every search is restricted to the topic's videos with a `where` filter;
+    membership is read per search, so videos added later are picked up.
+    """
+
+    def __init__(self, knowledge_base, topic):
+        self.knowledge_base = knowledge_base
+        self.topic = topic
+
+    def topic_filter(self):
+        video_ids = self.knowledge_base.topic_index.video_ids(self.topic)
+        if not video_ids:
+            return None
+        return {"video_id": {"$in": video_ids}}
+
+    def _merge(self, search_filter):
+        topic_filter = self.topic_filter()
+        if topic_filter is None:
+            return None
+        if search_filter:
+            return {"$and": [topic_filter, search_filter]}
+        return topic_filter
+
+    def similarity_search_with_score(self, query, k=4, filter=None, **kwargs):
+        where = self._merge(filter)
+        if where is None:
+            return []
+        return self.knowledge_base.vectorstore.similarity_search_with_score(
+            query, k=k, filter=where, **kwargs
+        )
+
+    async def asimilarity_search_with_score(self, query, k=4, filter=None, **kwargs):
+        where = self._merge(filter)
+        if where is None:
+            return []
+        return await self.knowledge_base.vectorstore.asimilarity_search_with_score(
+            query, k=k, filter=where, **kwargs
+        )
+
+    def similarity_search(self, query, k=4, filter=None, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter, **kwargs)]
+
+    def get_metadatas(self):
+        where = self.topic_filter()
+        if where is None:
+            return []
+        return self.knowledge_base.collection.get(where=where, include=["metadatas"])["metadatas"]
+
+    def get_chunks(self):
+        """(texts, metadatas) of every chunk in the topic"""
+        where = self.topic_filter()
+        if where is None:
+            return [], []
+        stored = self.knowledge_base.collection.get(where=where, include=["documents", "metadatas"])
+        return stored["documents"], stored["metadatas"]
+
+
+def open_topic_store(topic, embedding_function, knowledge_base=None):
+    """(vector store, path) of a topic, or (None, None) if it was never built.
+
+    Topics in the shared store come first; per-topic directories are legacy.
+    """
+    knowledge_base = knowledge_base or SharedKnowledgeBase(embedding_function)
+    if knowledge_base.has_topic(topic):
+        return knowledge_base.topic_view(topic), knowledge_base.path
+
+    from knowledge_base_io import topic_db_path
+
+    db_path = topic_db_path(topic)
+    if not os.path.exists(db_path):
+        return None, None
+    return chroma_class()(persist_directory=db_path, embedding_function=embedding_function), db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared knowledge base maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Copy a per-topic database into the shared store")
+    migrate_parser.add_argument("topic")
+    migrate_parser.add_argument("--db-path", help="Defaults to data/mvp_<topic>_db")
+
+    subparsers.add_parser("stats", help="Unique chunks vs topic memberships")
+
+    backfill_parser = subparsers.add_parser("backfill", help="Add numeric filter fields to older chunks")
+    backfill_parser.add_argument("topic")
+
+    args = parser.parse_args()
+    knowledge_base = SharedKnowledgeBase(embedding_function=None)
+    if args.command == "migrate":
+        from knowledge_base_io import topic_db_path
+
+        added, reused = knowledge_base.migrate_topic_db(
+            args.topic, args.db_path or topic_db_path(args.topic)
+        )
+        print(f"✅ Migrated '{args.topic}': {added} new chunks, {reused} already stored")
+    elif args.command == "backfill":
+        updated = knowledge_base.backfill_metadata(args.topic)
+        print(f"✅ Added filter fields to {updated} chunks of '{args.topic}'")
+    else:
+        for key, value in knowledge_base.stats().items():
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
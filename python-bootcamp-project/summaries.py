@@ -0,0 +1,272 @@
+# PRECOMPUTED SUMMARIES
+# Map-reduce summarization at build time: one LLM call per video (run
+# concurrently), then one call that combines the video summaries into a topic
+# summary. Both are stored in SQLite next to the vector stores, so overview
+# questions ("Can you summarize the main points?") are answered from the
+# summaries instead of from k=3 random chunks.
+#
+#   uv run python summaries.py build "VIBE CODING MCP DEVELOPMENT TUTORIAL"
+#   uv run python summaries.py show "VIBE CODING MCP DEVELOPMENT TUTORIAL"
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+SUMMARIES_DB_PATH = "data/kb_summaries.sqlite3"
+
+# About 3k tokens of transcript per map call
+MAX_TRANSCRIPT_CHARS = 12000
+EXCERPT_WINDOWS = 4
+
+VIDEO_SUMMARY_PROMPT = """Summarize this YouTube video transcript for a knowledge base about "{topic}".
+
+Video: "{title}" by {channel}
+
+Write 3-5 bullet points covering what the video teaches, the concrete steps, \
+tools or examples it shows, and its main conclusions. Be specific; do not \
+mention that this is a transcript.
+
+Transcript:
+{transcript}"""
+
+TOPIC_SUMMARY_PROMPT = """Below are summaries of the {count} videos in a knowledge base about "{topic}".
+
+Write an overview of the whole knowledge base in markdown:
+- one short paragraph on what the videos cover as a whole
+- **🎯 Core Topics Covered:** 3-6 bullets, each naming a theme and the videos that cover it
+- **💡 Key Learning Outcomes:** one short paragraph
+
+Only use information from the summaries.
+
+{summaries}"""
+
+
+# STORAGE
+class SummaryStore:
+    """Video summaries (shared by every topic containing the video) and topic summaries"""
+
+    def __init__(self, path=SUMMARIES_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        # Videos whose stored summary was reused (hits) vs. summarized (misses)
+        self._reuse = {"hits": 0, "misses": 0}
+
+    def reuse_stats(self):
+        """Video summary reuse counts in MetricsRegistry.register_cache form"""
+        return dict(self._reuse)
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS video_summaries ("
+            "video_id TEXT PRIMARY KEY, title TEXT, channel TEXT, url TEXT, "
+            "summary TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS topic_summaries ("
+            "topic TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+            "video_ids TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        return conn
+
+    def put_video(self, video, summary):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO video_summaries VALUES (?, ?, ?, ?, ?, ?)",
+                (video["video_id"], video.get("title"), video.get("channel"),
+                 video.get("url"), summary, time.time()),
+            )
+
+    def get_videos(self, video_ids):
+        """Video summary rows by video ID, in the given order; unknown IDs are skipped"""
+        if not video_ids or not os.path.exists(self.path):
+            return []
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                f"SELECT * FROM video_summaries WHERE video_id IN ({','.join('?' * len(video_ids))})",
+                list(video_ids),
+            ).fetchall()
+        by_id = {row["video_id"]: dict(row) for row in rows}
+        return [by_id[video_id] for video_id in video_ids if video_id in by_id]
+
+    def put_topic(self, topic, summary, video_ids):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO topic_summaries VALUES (?, ?, ?, ?)",
+                (topic, summary, ",".join(video_ids), time.time()),
+            )
+
+    def get_topic(self, topic):
+        """Topic summary with its video summaries, or None if not built yet"""
+        if not os.path.exists(self.path):
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT summary, video_ids FROM topic_summaries WHERE topic = ?", (topic,)
+            ).fetchone()
+        if row is None:
+            return None
+        summary, video_ids = row
+        return {
+            "topic": topic,
+            "summary": summary,
+            "videos": self.get_videos(video_ids.split(",") if video_ids else []),
+        }
+
+
+# MAP-REDUCE
+def _excerpt(transcript, limit=MAX_TRANSCRIPT_CHARS, windows=EXCERPT_WINDOWS):
+    """Transcript cut to `limit` characters from evenly spaced windows, so the
+    middle and end of long videos are summarized too"""
+    if len(transcript) <= limit:
+        return transcript
+    size = limit // windows
+    step = (len(transcript) - size) / (windows - 1)
+    return " … ".join(
+        transcript[int(i * step):int(i * step) + size] for i in range(windows)
+    )
+
+
+def videos_from_chunks(texts, metadatas):
+    """Rebuild per-video transcripts from stored chunks (in stored order)"""
+    videos = {}
+    for text, metadata in zip(texts, metadatas):
+        video = videos.setdefault(metadata["video_id"], {
+            "video_id": metadata["video_id"],
+            "title": metadata.get("title", "Unknown"),
+            "channel": metadata.get("channel", "Unknown"),
+            "url": metadata.get("url", "#"),
+            "transcript": "",
+        })
+        video["transcript"] += text
+    return list(videos.values())
+
+
+def build_summaries(llm, topic, videos, store=None, max_concurrency=5, reuse=True):
+    """Summarize each video concurrently, then the topic from the video summaries.
+
+    `videos` are dicts with video_id, title, channel, url and transcript.
+    Videos that already have a summary (e.g. from another topic) are not
+    summarized again unless `reuse` is False. Returns the stored topic summary.
+    """
+    store = store or SummaryStore()
+    videos = [v for v in videos if "Transcript not available" not in v["transcript"]]
+    if not videos:
+        return None
+    video_ids = [v["video_id"] for v in videos]
+
+    known = {row["video_id"] for row in store.get_videos(video_ids)} if reuse else set()
+    pending = [v for v in videos if v["video_id"] not in known]
+    store._reuse["hits"] += len(videos) - len(pending)
+    store._reuse["misses"] += len(pending)
+
+    # Map: one call per video, max_concurrency calls in flight
+    if pending:
+        prompts = [
+            VIDEO_SUMMARY_PROMPT.format(
+                topic=topic,
+                title=v["title"],
+                channel=v["channel"],
+                transcript=_excerpt(v["transcript"]),
+            )
+            for v in pending
+        ]
+        responses = llm.batch(prompts, config={"max_concurrency": max_concurrency})
+        for video, response in zip(pending, responses):
+            store.put_video(video, response.content.strip())
+
+    # Reduce: topic overview from the video summaries
+    rows = store.get_videos(video_ids)
+    summaries = "\n\n".join(
+        f'### "{row["title"]}" by {row["channel"]}\n{row["summary"]}' for row in rows
+    )
+    response = llm.invoke(
+        TOPIC_SUMMARY_PROMPT.format(count=len(rows), topic=topic, summaries=summaries)
+    )
+    store.put_topic(topic, response.content.strip(), video_ids)
+    return store.get_topic(topic)
+
+
+# ROUTING
+_WORD_PATTERN = re.compile(r"[a-z0-9']+")
+_OVERVIEW_WORDS = {"summary", "summarize", "summarise", "overview", "recap", "takeaways", "tldr"}
+# Words an overview request may contain besides the topic name; anything else
+# ("summarize what they say about auth") asks about something specific
+_OVERVIEW_FILLER = {
+    "a", "about", "all", "an", "are", "brief", "can", "content", "could", "cover",
+    "covered", "database", "everything", "for", "give", "i", "ideas", "in", "is",
+    "key", "knowledge", "base", "main", "me", "of", "please", "points", "provide",
+    "quick", "short", "the", "these", "this", "topic", "topics", "tutorials", "us",
+    "video", "videos", "what", "whole", "would", "you",
+}
+
+
+def is_overview_question(question, topic=""):
+    """True for requests to summarize the whole knowledge base"""
+    words = _WORD_PATTERN.findall(question.lower())
+    if not words:
+        return False
+    asks_overview = bool(_OVERVIEW_WORDS.intersection(words)) or "main points" in question.lower()
+    allowed = _OVERVIEW_FILLER | _OVERVIEW_WORDS | set(_WORD_PATTERN.findall(topic.lower()))
+    return asks_overview and all(word in allowed for word in words)
+
+
+def format_overview(topic_summary):
+    """Chat answer for an overview question"""
+    lines = [topic_summary["summary"], "", "**📺 Video by video:**"]
+    for video in topic_summary["videos"]:
+        lines += ["", f"**{video['title']}** by {video['channel']}", video["summary"]]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precomputed knowledge base summaries")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Summarize an existing knowledge base")
+    build_parser.add_argument("topic")
+    build_parser.add_argument("--max-concurrency", type=int, default=5)
+    build_parser.add_argument("--refresh", action="store_true", help="Re-summarize videos that already have a summary")
+
+    show_parser = subparsers.add_parser("show", help="Print a topic summary")
+    show_parser.add_argument("topic")
+
+    args = parser.parse_args()
+    if args.command == "show":
+        topic_summary = SummaryStore().get_topic(args.topic)
+        print(format_overview(topic_summary) if topic_summary else f"⚠️ No summary for '{args.topic}'")
+        return
+
+    # Needs OPENAI_API_KEY; stored chunks are read without embedding anything
+    from langchain_openai import ChatOpenAI
+    from shared_store import SharedKnowledgeBase, list_topics
+
+    if args.topic in list_topics():
+        texts, metadatas = SharedKnowledgeBase(embedding_function=None).topic_view(args.topic).get_chunks()
+    else:
+        import chromadb
+        from knowledge_base_io import topic_db_path
+
+        collection = chromadb.PersistentClient(path=topic_db_path(args.topic)).get_collection("langchain")
+        stored = collection.get(include=["documents", "metadatas"])
+        texts, metadatas = stored["documents"], stored["metadatas"]
+
+    videos = videos_from_chunks(texts, metadatas)
+    topic_summary = build_summaries(
+        ChatOpenAI(model="gpt-4o-mini", temperature=0.3),
+        args.topic,
+        videos,
+        max_concurrency=args.max_concurrency,
+        reuse=not args.refresh,
+    )
+    print(f"✅ Summarized {len(topic_summary['videos'])} videos for '{args.topic}'")
+
+
+if __name__ == "__main__":
+    main()
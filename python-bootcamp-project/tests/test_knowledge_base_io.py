@@ -0,0 +1,141 @@
+"""Export/import round trips of knowledge_base_io (run from the project root:
+`python -m unittest discover tests`)"""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import knowledge_base_io
+
+HAS_DEPENDENCIES = all(
+    importlib.util.find_spec(name) for name in ("pyarrow", "chromadb", "numpy")
+)
+
+
+class SourceCollectionTestCase(unittest.TestCase):
+    """Builds a small Chroma collection in a temporary directory"""
+
+    def setUp(self):
+        import chromadb
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.tmp.name, "source_db")
+        collection = chromadb.PersistentClient(path=self.source_path).get_or_create_collection(
+            knowledge_base_io.DEFAULT_COLLECTION_NAME
+        )
+        self.ids = [f"chunk-{i}" for i in range(5)]
+        self.documents = [f"transcript chunk number {i}" for i in range(5)]
+        self.metadatas = [
+            {"video_id": f"vid{i % 2}", "title": f"Video {i % 2}", "view_count": 100 * i, "published_ts": 1700000000 + i}
+            for i in range(5)
+        ]
+        # A key that only shows up after the first row goes through extra_metadata
+        self.metadatas[3]["note"] = "late key"
+        self.embeddings = [[float(i) + j / 8 for j in range(8)] for i in range(5)]
+        collection.add(
+            ids=self.ids,
+            documents=self.documents,
+            metadatas=self.metadatas,
+            embeddings=self.embeddings,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+@unittest.skipUnless(HAS_DEPENDENCIES, "needs pyarrow, chromadb and numpy")
+class RoundTripTest(SourceCollectionTestCase):
+    def _round_trip(self, file_name):
+        import chromadb
+
+        output_path = os.path.join(self.tmp.name, file_name)
+        exported = knowledge_base_io.export_topic("Test Topic", output_path, db_path=self.source_path)
+        self.assertEqual(exported, len(self.ids))
+
+        target_path = os.path.join(self.tmp.name, f"imported_{file_name}_db")
+        imported, _ = knowledge_base_io.import_topic(output_path, db_path=target_path)
+        self.assertEqual(imported, len(self.ids))
+
+        stored = chromadb.PersistentClient(path=target_path).get_collection(
+            knowledge_base_io.DEFAULT_COLLECTION_NAME
+        ).get(ids=self.ids, include=["documents", "metadatas", "embeddings"])
+        by_id = {
+            chunk_id: (document, metadata, list(embedding))
+            for chunk_id, document, metadata, embedding in zip(
+                stored["ids"], stored["documents"], stored["metadatas"], stored["embeddings"]
+            )
+        }
+        self.assertEqual(sorted(by_id), sorted(self.ids))
+        for chunk_id, document, metadata, embedding in zip(
+            self.ids, self.documents, self.metadatas, self.embeddings
+        ):
+            stored_document, stored_metadata, stored_embedding = by_id[chunk_id]
+            self.assertEqual(stored_document, document)
+            self.assertEqual(stored_metadata, metadata)
+            # Vectors are stored as float32; these values are exact in float32
+            self.assertEqual(stored_embedding, embedding)
+
+    def test_parquet_round_trip(self):
+        self._round_trip("snapshot.parquet")
+
+    def test_arrow_round_trip(self):
+        self._round_trip("snapshot.arrow")
+
+    def test_failed_export_leaves_no_file(self):
+        output_path = os.path.join(self.tmp.name, "broken.arrow")
+        with mock.patch.object(knowledge_base_io, "_to_record_batch", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                knowledge_base_io.export_topic("Test Topic", output_path, db_path=self.source_path)
+        self.assertFalse(os.path.exists(output_path))
+
+
+@unittest.skipUnless(
+    HAS_DEPENDENCIES and importlib.util.find_spec("langchain_chroma"),
+    "needs pyarrow, chromadb, numpy and langchain_chroma",
+)
+class SharedStoreRoundTripTest(SourceCollectionTestCase):
+    def setUp(self):
+        super().setUp()
+        # The shared store lives under data/ relative to the working directory
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        super().tearDown()
+
+    def test_shared_store_round_trip(self):
+        first_path = os.path.join(self.tmp.name, "legacy.parquet")
+        knowledge_base_io.export_topic("Test Topic", first_path, db_path=self.source_path)
+        imported, _ = knowledge_base_io.import_topic(first_path)
+        self.assertEqual(imported, len(self.ids))
+        # Importing again reuses the stored chunks instead of duplicating them
+        knowledge_base_io.import_topic(first_path)
+
+        # Without db_path the topic is found in the shared store
+        shared_path = os.path.join(self.tmp.name, "shared.arrow")
+        self.assertEqual(knowledge_base_io.export_topic("Test Topic", shared_path), len(self.ids))
+
+        imported_path = os.path.join(self.tmp.name, "from_shared_db")
+        knowledge_base_io.import_topic(shared_path, db_path=imported_path)
+        import chromadb
+
+        stored = chromadb.PersistentClient(path=imported_path).get_collection(
+            knowledge_base_io.DEFAULT_COLLECTION_NAME
+        ).get(include=["documents", "metadatas", "embeddings"])
+        # Shared chunk IDs are derived from the content, so compare by document
+        by_document = {
+            document: (metadata, list(embedding))
+            for document, metadata, embedding in zip(
+                stored["documents"], stored["metadatas"], stored["embeddings"]
+            )
+        }
+        self.assertEqual(sorted(by_document), sorted(self.documents))
+        for document, metadata, embedding in zip(self.documents, self.metadatas, self.embeddings):
+            self.assertEqual(by_document[document], (metadata, embedding))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Query filter parsing and metadata normalization (run from the project root:
+`python -m unittest discover tests`)"""
+
+import calendar
+import unittest
+
+from query_filters import duration_seconds, parse_query_filters, published_timestamp
+
+YEAR_2025 = calendar.timegm((2025, 1, 1, 0, 0, 0))
+
+
+class ParseQueryFiltersTest(unittest.TestCase):
+    def test_no_filters(self):
+        self.assertEqual(parse_query_filters("How do MCP servers work?"), (None, "How do MCP servers work?"))
+
+    def test_views_with_million_suffix(self):
+        where, query = parse_query_filters("MCP tips in videos with over 1m views")
+        self.assertEqual(where, {"view_count": {"$gte": 1_000_000}})
+        self.assertEqual(query, "MCP tips")
+
+    def test_views_with_thousand_suffix(self):
+        where, _ = parse_query_filters("agents with fewer than 1.5k views")
+        self.assertEqual(where, {"view_count": {"$lte": 1500}})
+
+    def test_bare_m_is_not_minutes(self):
+        query = "how to store 5m records over 3m rows"
+        self.assertEqual(parse_query_filters(query), (None, query))
+
+    def test_duration_units(self):
+        self.assertEqual(
+            parse_query_filters("cursor tutorials under 10 minutes")[0],
+            {"duration_seconds": {"$lte": 600}},
+        )
+        self.assertEqual(
+            parse_query_filters("videos longer than 1 hour about agents")[0],
+            {"duration_seconds": {"$gte": 3600}},
+        )
+        self.assertEqual(
+            parse_query_filters("clips under 90s")[0],
+            {"duration_seconds": {"$lte": 90}},
+        )
+
+    def test_views_and_duration_together(self):
+        where, query = parse_query_filters("MCP videos over 20 mins with over 1m views")
+        self.assertEqual(
+            where,
+            {"$and": [{"view_count": {"$gte": 1_000_000}}, {"duration_seconds": {"$gte": 1200}}]},
+        )
+        self.assertEqual(query, "MCP")
+
+    def test_years(self):
+        where, query = parse_query_filters("What changed in MCP after 2024?")
+        self.assertEqual(where, {"published_ts": {"$gte": YEAR_2025}})
+        self.assertEqual(query, "What changed in MCP?")
+
+        where, _ = parse_query_filters("videos from 2024 about cursor")
+        self.assertEqual(where, {"published_ts": {"$gte": calendar.timegm((2024, 1, 1, 0, 0, 0))}})
+
+    def test_recent(self):
+        where, _ = parse_query_filters("MCP news from the last 2 weeks", now=1_000_000_000)
+        self.assertEqual(where, {"published_ts": {"$gte": 1_000_000_000 - 14 * 86400}})
+
+    def test_channel_after_from_or_by(self):
+        where, query = parse_query_filters("MCP servers from AI LABS after 2024", channels=["AI LABS"])
+        self.assertEqual(
+            where,
+            {"$and": [{"channel": {"$eq": "AI LABS"}}, {"published_ts": {"$gte": YEAR_2025}}]},
+        )
+        self.assertEqual(query, "MCP servers")
+
+        where, query = parse_query_filters("What does the video by Matt Pocock say?", channels=["Matt Pocock"])
+        self.assertEqual(where, {"channel": {"$eq": "Matt Pocock"}})
+        self.assertEqual(query, "What does the video say?")
+
+    def test_channel_needs_word_boundaries(self):
+        query = "explain MCP tools from scratch"
+        self.assertEqual(parse_query_filters(query, channels=["AI", "MCP"]), (None, query))
+
+    def test_bare_channel_mention_is_not_a_filter(self):
+        query = "Does AI LABS recommend Cursor?"
+        self.assertEqual(parse_query_filters(query, channels=["AI LABS"]), (None, query))
+
+    def test_longest_channel_name_wins(self):
+        where, _ = parse_query_filters("agents from AI LABS Pro", channels=["AI LABS", "AI LABS Pro"])
+        self.assertEqual(where, {"channel": {"$eq": "AI LABS Pro"}})
+
+
+class DurationSecondsTest(unittest.TestCase):
+    def test_iso_8601(self):
+        self.assertEqual(duration_seconds("PT4M13S"), 253)
+        self.assertEqual(duration_seconds("PT1H2M3S"), 3723)
+        self.assertEqual(duration_seconds("PT45S"), 45)
+
+    def test_display_strings(self):
+        self.assertEqual(duration_seconds("4:13"), 253)
+        self.assertEqual(duration_seconds("1:02:03"), 3723)
+
+    def test_numbers_pass_through(self):
+        self.assertEqual(duration_seconds(90), 90)
+
+    def test_unparseable(self):
+        for value in (None, "", "PT", "N/A", "4 minutes"):
+            self.assertIsNone(duration_seconds(value))
+
+
+class PublishedTimestampTest(unittest.TestCase):
+    def test_formats(self):
+        expected = calendar.timegm((2024, 5, 1, 10, 0, 0))
+        self.assertEqual(published_timestamp("2024-05-01T10:00:00Z"), expected)
+        self.assertEqual(published_timestamp("2024-05-01 10:00:00"), expected)
+        self.assertEqual(published_timestamp("2024-05-01"), calendar.timegm((2024, 5, 1, 0, 0, 0)))
+
+    def test_numbers_pass_through(self):
+        self.assertEqual(published_timestamp(1714557600), 1714557600)
+
+    def test_unparseable(self):
+        for value in (None, "", "Unknown", "May 2024"):
+            self.assertIsNone(published_timestamp(value))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,29 +1,14 @@
 # YOUTUBE CHANNEL AGENT - MVP WITH ADVANCED CHAT
 # Simple workflow: Topic → Top 5 Videos → Vector DB → Advanced Q&A Chat
 
+# Only lightweight modules are imported here so the page paints right away.
+# YouTube, LangChain, OpenAI and Chroma modules are imported inside the code
+# paths that use them (see benchmarks/import_time.py).
 import streamlit as st
 import yaml
 import os
-import pandas as pd
-from pathlib import Path
-
-# YouTube API imports
-from googleapiclient.discovery import build
-from youtube_transcript_api import YouTubeTranscriptApi
-import re
-
-# Advanced RAG imports
-try:
-    from langchain_chroma import Chroma
-except ImportError:
-    from langchain_community.vectorstores import Chroma
-
-from langchain_community.chat_message_histories import StreamlitChatMessageHistory
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain.chains import create_history_aware_retriever, create_retrieval_chain
-from langchain.chains.combine_documents import create_stuff_documents_chain
+from contextlib import nullcontext
+from functools import cached_property
 
 # PAGE CONFIG
 st.set_page_config(
@@ -45,13 +30,24 @@ def load_credentials():
         st.error(f"❌ Error loading credentials: {e}")
         st.stop()
 
-credentials = load_credentials()
-os.environ["OPENAI_API_KEY"] = credentials['openai']
+def get_credentials():
+    """Credentials on first use; also exports the OpenAI key for LangChain"""
+    credentials = load_credentials()
+    os.environ["OPENAI_API_KEY"] = credentials['openai']
+    return credentials
 
 # YOUTUBE CRAWLER CLASS
 class YouTubeCrawler:
     def __init__(self, api_key):
-        self.youtube = build('youtube', 'v3', developerKey=api_key)
+        self.api_key = api_key
+    
+    @cached_property
+    def youtube(self):
+        """YouTube Data API client, built when the first request is made"""
+        from googleapiclient.discovery import build
+        
+        # google-api-python-client 2.x reads its bundled discovery document, no request is made
+        return build('youtube', 'v3', developerKey=self.api_key)
     
     def search_videos(self, query, max_results=5):
         """Search YouTube for top videos by topic"""
@@ -105,15 +101,14 @@ class YouTubeCrawler:
     
     def _parse_duration(self, duration_iso):
         """Convert ISO 8601 duration to readable format (PT4M13S -> 4:13)"""
-        import re
-        match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration_iso)
-        if not match:
+        from query_filters import duration_seconds
+        
+        total = duration_seconds(duration_iso)
+        if total is None:
             return "Unknown"
         
-        hours, minutes, seconds = match.groups()
-        hours = int(hours) if hours else 0
-        minutes = int(minutes) if minutes else 0
-        seconds = int(seconds) if seconds else 0
+        hours, rest = divmod(total, 3600)
+        minutes, seconds = divmod(rest, 60)
         
         if hours > 0:
             return f"{hours}:{minutes:02d}:{seconds:02d}"
@@ -122,6 +117,8 @@ class YouTubeCrawler:
     
     def get_transcript(self, video_id):
         """Get transcript for a video"""
+        from youtube_transcript_api import YouTubeTranscriptApi
+        
         try:
             transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
             transcript_text = " ".join([entry['text'] for entry in transcript_list])
@@ -129,9 +126,10 @@ class YouTubeCrawler:
         except Exception as e:
             return f"Transcript not available: {str(e)}"
     
-    def process_videos(self, videos):
+    def process_videos(self, videos, trace=None):
         """Process videos and extract transcripts"""
         processed_data = []
+        stage = trace.stage if trace else (lambda name: nullcontext())
         
         st.subheader("📝 Processing Videos...")
         progress_bar = st.progress(0)
@@ -144,11 +142,14 @@ class YouTubeCrawler:
                 st.write(f"**URL:** {video['url']}")
                 
                 # Get transcript
-                transcript = self.get_transcript(video['video_id'])
+                with stage("transcripts"):
+                    transcript = self.get_transcript(video['video_id'])
                 
                 if "Transcript not available" in transcript:
                     st.warning("⚠️ No transcript available")
                 else:
+                    if trace:
+                        trace.count("transcripts")
                     st.success("✅ Transcript extracted")
                     st.write(f"**Preview:** {transcript[:200]}...")
                 
@@ -173,129 +174,189 @@ class YouTubeCrawler:
 
 # RAG SYSTEM CLASS
 class AdvancedRAG:
+    # One instance per process (see get_rag), so OpenAI clients and opened
+    # vector stores are created on first use, not on every script rerun
     def __init__(self):
-        self.embedding_function = OpenAIEmbeddings(model="text-embedding-ada-002")
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+        self._legacy_stores = {}
+    
+    @cached_property
+    def embedding_function(self):
+        from langchain_openai import OpenAIEmbeddings
+        get_credentials()
+        return OpenAIEmbeddings(model="text-embedding-ada-002")
+    
+    @cached_property
+    def llm(self):
+        from langchain_openai import ChatOpenAI
+        get_credentials()
+        return ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+    
+    @cached_property
+    def shared_kb(self):
+        from shared_store import SharedKnowledgeBase
+        shared_kb = SharedKnowledgeBase(self.embedding_function)
+        get_metrics().register_cache("shared_chunks", shared_kb.reuse_stats)
+        return shared_kb
+    
+    @cached_property
+    def summary_store(self):
+        from summaries import SummaryStore
+        summary_store = SummaryStore()
+        get_metrics().register_cache("video_summaries", summary_store.reuse_stats)
+        return summary_store
     
     def load_existing_database(self, topic):
         """Load existing vector database if it exists"""
-        db_path = f"data/mvp_{topic.replace(' ', '_')}_db"
-        if os.path.exists(db_path):
-            try:
-                vectorstore = Chroma(
-                    persist_directory=db_path,
-                    embedding_function=self.embedding_function
-                )
-                return vectorstore, db_path
-            except Exception as e:
-                st.warning(f"Could not load existing database: {e}")
-                return None, None
-        return None, None
+        from shared_store import open_topic_store
+        
+        # Shared-store topics come first; opened per-topic (legacy) databases are kept
+        if topic in self._legacy_stores and not self.shared_kb.has_topic(topic):
+            return self._legacy_stores[topic]
+        try:
+            vectorstore, db_path = open_topic_store(topic, self.embedding_function, self.shared_kb)
+        except Exception as e:
+            st.warning(f"Could not load existing database: {e}")
+            return None, None
+        if vectorstore is not None and db_path != self.shared_kb.path:
+            self._legacy_stores[topic] = (vectorstore, db_path)
+        return vectorstore, db_path
     
-    def create_knowledge_base(self, processed_data, topic):
+    def create_knowledge_base(self, processed_data, topic, trace=None):
         """Create vector database from video transcripts"""
+        from query_filters import normalize_metadata
+        
         documents = []
         metadatas = []
+        stage = trace.stage if trace else (lambda name: nullcontext())
         
-        for item in processed_data:
-            if "Transcript not available" not in item['transcript']:
-                # Chunk the transcript
-                transcript = item['transcript']
-                chunk_size = 1000
+        with stage("chunk"):
+            for item in processed_data:
+                if "Transcript not available" not in item['transcript']:
+                    # Chunk the transcript
+                    transcript = item['transcript']
+                    chunk_size = 1000
                 
-                for i in range(0, len(transcript), chunk_size):
-                    chunk = transcript[i:i + chunk_size]
-                    documents.append(chunk)
-                    metadatas.append({
-                        'title': item['title'],
-                        'channel': item['channel'],
-                        'video_id': item['video_id'],
-                        'url': item['url'],
-                        'duration': item.get('duration', 'Unknown'),
-                        'view_count': item.get('view_count', 0),
-                        'like_count': item.get('like_count', 0),
-                        'published_at': item.get('published_at', ''),
-                        'topic': topic
-                    })
+                    for i in range(0, len(transcript), chunk_size):
+                        chunk = transcript[i:i + chunk_size]
+                        documents.append(chunk)
+                        # Numeric duration_seconds/published_ts are added for filtered search
+                        metadatas.append(normalize_metadata({
+                            'title': item['title'],
+                            'channel': item['channel'],
+                            'video_id': item['video_id'],
+                            'url': item['url'],
+                            'duration': item.get('duration', 'Unknown'),
+                            'view_count': item.get('view_count', 0),
+                            'like_count': item.get('like_count', 0),
+                            'published_at': item.get('published_at', ''),
+                            'topic': topic
+                        }))
         
         if not documents:
             st.error("❌ No valid transcripts found to create knowledge base")
             return None
         
-        # Create vector store
-        db_path = f"data/mvp_{topic.replace(' ', '_')}_db"
-        vectorstore = Chroma.from_texts(
-            texts=documents,
-            metadatas=metadatas,
-            embedding=self.embedding_function,
-            persist_directory=db_path
-        )
+        # Add to the shared store; chunks already stored by other topics are not embedded again
+        from shared_store import SHARED_DB_PATH
         
-        st.success(f"✅ Knowledge base created with {len(documents)} text chunks")
-        return vectorstore, db_path
+        with stage("embed"):
+            added, reused = self.shared_kb.add_chunks(topic, documents, metadatas)
+        if trace:
+            trace.count("chunks", added)
+            trace.count("chunks_reused", reused)
+        
+        st.success(f"✅ Knowledge base created with {added + reused} text chunks ({added} new, {reused} shared with other topics)")
+        return self.shared_kb.topic_view(topic), SHARED_DB_PATH
     
-    def create_advanced_rag_chain(self, vectorstore, topic):
-        """Create history-aware RAG chain with memory integration"""
+    def create_summaries(self, videos, topic, trace=None):
+        """Precompute per-video and topic summaries for overview questions"""
+        from summaries import build_summaries
+        
+        stage = trace.stage if trace else (lambda name: nullcontext())
         try:
-            retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-            
-            # STAGE 1: History-aware question contextualization
-            contextualize_q_system_prompt = f"""Given a chat history and the latest user question \
-which might reference context in the chat history, formulate a standalone question \
-which can be understood without the chat history. Do NOT answer the question, \
-just reformulate it if needed and otherwise return it as is.
-
-Focus on {topic} concepts and YouTube video content."""
-            
-            contextualize_q_prompt = ChatPromptTemplate.from_messages([
-                ("system", contextualize_q_system_prompt),
-                MessagesPlaceholder("chat_history"),
-                ("human", "{input}"),
-            ])
-            
-            # Create history-aware retriever
-            history_aware_retriever = create_history_aware_retriever(
-                self.llm, retriever, contextualize_q_prompt
-            )
-            
-            # STAGE 2: Answer generation with context and history
-            qa_system_prompt = f"""You are an expert YouTube Channel Agent with access to a curated database of {topic} videos.
+            with st.spinner("📝 Summarizing videos..."), stage("summarize"):
+                topic_summary = build_summaries(self.llm, topic, videos, store=self.summary_store)
+        except Exception as e:
+            st.warning(f"⚠️ Could not create summaries: {e}")
+            return None
+        if topic_summary and trace:
+            trace.count("summaries", len(topic_summary['videos']))
+        return topic_summary
+    
+    def summarize_existing_database(self, vectorstore, topic):
+        """Summaries for a knowledge base built before summaries existed"""
+        from summaries import videos_from_chunks
+        
+        if hasattr(vectorstore, 'get_chunks'):
+            texts, metadatas = vectorstore.get_chunks()
+        else:
+            stored = vectorstore._collection.get(include=['documents', 'metadatas'])
+            texts, metadatas = stored['documents'], stored['metadatas']
+        return self.create_summaries(videos_from_chunks(texts, metadatas), topic)
 
-You have access to full video transcripts and complete metadata for each source. The context includes both the video content and all available metadata about each video source.
+@st.cache_resource
+def get_rag():
+    """AdvancedRAG shared by all sessions of the process"""
+    return AdvancedRAG()
 
-When answering questions, you can reference any information available in the context, including video content, metadata, and source details. Use this information to provide comprehensive, accurate responses.
+# CHAT SERVICE
+@st.cache_resource
+def get_rag_service():
+    """One async RAG service per process, shared by all chat sessions"""
+    from rag_service import RAGService
+    
+    get_credentials()
+    return RAGService(metrics=get_metrics())
 
-ALWAYS draw from the video content and source metadata in your responses. Use all available information from the context to give specific, detailed answers.
+@st.cache_resource
+def get_metrics():
+    """Process metrics registry; starts the local endpoint when RAG_METRICS_PORT is set"""
+    from rag_metrics import METRICS, start_metrics_server
+    
+    start_metrics_server(METRICS)
+    return METRICS
 
-Context from videos:
-{{context}}"""
-            
-            qa_prompt = ChatPromptTemplate.from_messages([
-                ("system", qa_system_prompt),
-                MessagesPlaceholder("chat_history"),
-                ("human", "{input}")
-            ])
-            
-            # Create question-answer chain
-            question_answer_chain = create_stuff_documents_chain(self.llm, qa_prompt)
-            
-            # Combine into full RAG chain
-            rag_chain = create_retrieval_chain(history_aware_retriever, question_answer_chain)
-            
-            return rag_chain
-            
-        except Exception as e:
-            st.error(f"❌ Error creating advanced RAG chain: {e}")
-            return None
+def answer_question(question, msgs):
+    """Send a question to the RAG service and record the answer in chat history"""
+    # History before this question; the question itself is the chain input
+    chat_history = list(msgs.messages)
+    msgs.add_user_message(question)
+    
+    try:
+        answer, sources = get_rag_service().ask(
+            st.session_state.session_id,
+            st.session_state.topic,
+            question,
+            chat_history,
+        )
+        
+        # Add response to history
+        msgs.add_ai_message(answer)
+        
+        # Add sources as a separate message
+        if sources:
+            msgs.add_ai_message(sources)
+        
+    except Exception as e:
+        error_msg = f"❌ Error processing question: {e}"
+        msgs.add_ai_message(error_msg)
+    
+    # Trigger rerun to show the new messages
+    st.rerun()
 
 # MAIN APPLICATION
 def main():
+    if os.environ.get("RAG_METRICS_PORT"):
+        get_metrics()
+    
     # DATABASE SELECTION OR CREATION
     st.header("🔍 Select Database or Create New")
     
     # Check for existing databases
-    rag = AdvancedRAG()
-    available_databases = ["VIBE CODING MCP DEVELOPMENT TUTORIAL"]  # Could be expanded to scan for all databases
+    rag = get_rag()
+    from shared_store import list_topics
+    available_databases = ["VIBE CODING MCP DEVELOPMENT TUTORIAL"]
+    available_databases += [t for t in list_topics() if t not in available_databases]
     
     # Database selection options
     database_option = st.radio(
@@ -346,8 +407,6 @@ def main():
         return
     
     # Load the database for the selected/entered topic
-    if not hasattr(rag, 'load_existing_database'):  # rag was already created above
-        rag = AdvancedRAG()
     current_db, current_db_path = rag.load_existing_database(topic)
     
     if current_db:
@@ -363,12 +422,16 @@ def main():
                 
             try:
                 # Get ALL documents directly from the collection - no similarity search needed
-                collection = current_db._collection
-                all_results = collection.get(include=['metadatas'])
+                if hasattr(current_db, 'get_metadatas'):
+                    all_metadatas = current_db.get_metadatas()
+                    storage = "Shared chunk store"
+                else:
+                    all_metadatas = current_db._collection.get(include=['metadatas'])['metadatas']
+                    storage = f"Per-topic collection {current_db._collection.id}"
                 
                 # Extract unique videos from metadata
                 videos_info = {}
-                for metadata in all_results['metadatas']:
+                for metadata in all_metadatas:
                     title = metadata.get('title', 'Unknown')
                     channel = metadata.get('channel', 'Unknown')
                     url = metadata.get('url', '#')
@@ -377,6 +440,7 @@ def main():
                     
                     if title not in videos_info and title != 'Unknown':
                         videos_info[title] = {
+                            'video_id': metadata.get('video_id'),
                             'channel': channel,
                             'url': url,
                             'duration': duration,
@@ -384,31 +448,30 @@ def main():
                         }
                 
                 st.markdown(f"**📹 Videos in Database:** {len(videos_info)}")
-                st.markdown(f"**📄 Total Document Chunks:** {collection.count()}")
+                st.markdown(f"**📄 Total Document Chunks:** {len(all_metadatas)}")
                 
                 # Debug info
                 with st.expander("🔍 Debug Info"):
-                    st.write(f"Collection ID: {collection.id}")
-                    st.write(f"Total metadata entries: {len(all_results['metadatas'])}")
+                    st.write(f"Storage: {storage}")
+                    st.write(f"Total metadata entries: {len(all_metadatas)}")
                     st.write("Sample titles found:")
                     for i, title in enumerate(sorted(videos_info.keys())):
                         st.write(f"{i+1}. {title}")
                 
-                # Overall summary and key insights
-                st.markdown("### 📋 Knowledge Base Summary:")
-                st.markdown(f"""
-                **Your knowledge base contains comprehensive MCP (Model Context Protocol) development tutorials** covering everything from basic concepts to advanced implementation techniques. The content spans **{len(videos_info)} tutorial videos from Vibe Coding** that provide both theoretical understanding and practical hands-on experience.
-                
-                **🎯 Core Topics Covered:**
-                • **MCP Protocol Fundamentals** - What MCP is, how it works, and why it's important for AI development
-                • **Server Creation Workflows** - Multiple approaches from 5-prompt quick builds to detailed 10-minute tutorials  
-                • **API Integration Techniques** - How to connect external APIs and data sources to your MCP server
-                • **Beginner-Friendly Guidance** - Complete starter tutorials for developers new to MCP
-                • **Development Philosophy** - Understanding the "vibe coding" approach and mindset for rapid prototyping
+                # Overall summary, precomputed when the knowledge base was built
+                from summaries import SummaryStore
                 
-                **💡 Key Learning Outcomes:**
-                After exploring this knowledge base, you'll understand how to build MCP servers from scratch, integrate external APIs, follow best practices for rapid development, and avoid common pitfalls. The tutorials emphasize practical implementation over theory, making complex concepts accessible to beginners while providing valuable insights for experienced developers.
-                """)
+                st.markdown("### 📋 Knowledge Base Summary:")
+                topic_summary = SummaryStore().get_topic(topic)
+                video_summaries = {}
+                if topic_summary:
+                    st.markdown(topic_summary['summary'])
+                    video_summaries = {video['video_id']: video['summary'] for video in topic_summary['videos']}
+                else:
+                    st.info("No summary yet for this knowledge base.")
+                    if st.button("📝 Generate Summary", key="generate_summary"):
+                        rag.summarize_existing_database(current_db, topic)
+                        st.rerun()
                 
                 st.markdown("### 📺 Videos Available:")
                 for i, (title, info) in enumerate(videos_info.items(), 1):
@@ -417,6 +480,8 @@ def main():
                     **{i}. {title}**  
                     👤 *{info['channel']}* | ⏱️ {info['duration']} | 👁️ {view_count_formatted} views | [🔗 Watch Video]({info['url']})
                     """)
+                    if info['video_id'] in video_summaries:
+                        st.caption(video_summaries[info['video_id']])
                     
             except Exception as e:
                 st.warning(f"Could not load content summary: {e}")
@@ -442,11 +507,15 @@ def main():
         creation_topic = st.session_state.get('creation_topic', topic)
         if 'creation_topic' in st.session_state:
             del st.session_state.creation_topic
-        crawler = YouTubeCrawler(credentials['youtube'])
+        from rag_metrics import BuildTrace
+        
+        crawler = YouTubeCrawler(get_credentials()['youtube'])
+        build_trace = BuildTrace(creation_topic, registry=get_metrics())
         
         # Search videos
-        with st.spinner(f"🔍 Searching YouTube for: '{creation_topic}'"):
+        with st.spinner(f"🔍 Searching YouTube for: '{creation_topic}'"), build_trace.stage("search"):
             videos = crawler.search_videos(creation_topic, max_results=5)
+        build_trace.count("videos", len(videos))
         
         if not videos:
             st.error("No videos found for this topic. Try a different search term.")
@@ -455,15 +524,19 @@ def main():
         st.success(f"✅ Found {len(videos)} videos!")
         
         # Process videos
-        processed_data = crawler.process_videos(videos)
+        processed_data = crawler.process_videos(videos, trace=build_trace)
         
         # Create knowledge base
         st.header("🧠 Building Knowledge Base")
         with st.spinner("Creating vector database..."):
-            result = rag.create_knowledge_base(processed_data, creation_topic)
+            result = rag.create_knowledge_base(processed_data, creation_topic, trace=build_trace)
+            if result:
+                rag.create_summaries(processed_data, creation_topic, trace=build_trace)
+            build_trace.finish()
             
             if result:
                 vectorstore, db_path = result
+                get_rag_service().invalidate_topic(creation_topic)
                 st.session_state.vectorstore = vectorstore
                 st.session_state.topic = creation_topic
                 st.success("🎉 Knowledge base ready! You can now chat below.")
@@ -475,9 +548,20 @@ def main():
         # Show topic info
         st.info(f"📚 Knowledge Base: **{st.session_state.topic}** | Ready for questions!")
         
-        # Initialize chat memory
-        msgs = StreamlitChatMessageHistory(key="chat_messages")
-        if len(msgs.messages) == 0:
+        # Questions are answered by the shared async service, keyed by session.
+        # The ID is kept in the URL so a reload or restart finds the same history;
+        # it is generated here, and anything not shaped like one is replaced.
+        from chat_history import SQLiteChatMessageHistory, is_valid_session_id, new_session_id
+        if 'session_id' not in st.session_state:
+            session_id = st.query_params.get("session")
+            st.session_state.session_id = session_id if is_valid_session_id(session_id) else new_session_id()
+            st.query_params["session"] = st.session_state.session_id
+        
+        # Initialize chat memory: stored in SQLite, only the latest messages stay in memory
+        if 'chat_history' not in st.session_state:
+            st.session_state.chat_history = SQLiteChatMessageHistory(st.session_state.session_id)
+        msgs = st.session_state.chat_history
+        if msgs.count() == 0:
             msgs.add_ai_message(f"""👋 Hi! I'm your YouTube Channel Agent with access to **5 MCP development tutorial videos** from Vibe Coding!
 
 I have detailed knowledge from these videos:
@@ -495,18 +579,6 @@ I can help you with:
 
 What would you like to learn about MCP development?""")
         
-        # Create RAG chain (fix the error)
-        if 'rag_chain' not in st.session_state:
-            with st.spinner("🧠 Initializing chat system..."):
-                try:
-                    st.session_state.rag_chain = rag.create_advanced_rag_chain(st.session_state.vectorstore, st.session_state.topic)
-                    if st.session_state.rag_chain is None:
-                        st.error("❌ Failed to initialize chat system")
-                        return
-                except Exception as e:
-                    st.error(f"❌ Error initializing chat: {e}")
-                    return
-        
         # Quick Questions (better positioned)
         with st.expander("💡 Quick Questions - Click to Ask"):
             # Generate contextual quick questions based on topic
@@ -539,10 +611,11 @@ What would you like to learn about MCP development?""")
         # Chat management
         col1, col2 = st.columns([3, 1])
         with col1:
-            st.markdown(f"**💬 Chat Messages:** {len(msgs.messages)}")
+            st.markdown(f"**💬 Chat Messages:** {msgs.count()}")
         with col2:
             if st.button("🗑️ Clear Chat", use_container_width=True):
                 msgs.clear()
+                st.session_state.history_pages = 0
                 msgs.add_ai_message(f"👋 Chat cleared! I'm ready for a fresh conversation about {st.session_state.topic}.")
                 st.rerun()
         
@@ -550,110 +623,39 @@ What would you like to learn about MCP development?""")
         if hasattr(st.session_state, 'quick_question'):
             question = st.session_state.quick_question
             delattr(st.session_state, 'quick_question')
-            
-            # Add to history first
-            msgs.add_user_message(question)
-            
-            # Generate response with history awareness
-            try:
-                # Wrap RAG chain with message history
-                rag_with_history = RunnableWithMessageHistory(
-                    st.session_state.rag_chain,
-                    lambda session_id: msgs,
-                    input_messages_key="input",
-                    history_messages_key="chat_history",
-                    output_messages_key="answer",
-                )
-                
-                # Invoke the advanced RAG chain
-                response = rag_with_history.invoke(
-                    {"input": question},
-                    config={"configurable": {"session_id": "youtube_agent"}}
-                )
-                
-                # Add response to history
-                msgs.add_ai_message(response['answer'])
-                
-                # Store sources for display
-                if 'context' in response and response['context']:
-                    sources_seen = set()
-                    sources_text = "**📚 Sources Used:**\n"
-                    for doc in response['context']:
-                        title = doc.metadata.get('title', 'Unknown')
-                        channel = doc.metadata.get('channel', 'Unknown')
-                        url = doc.metadata.get('url', '#')
-                        
-                        source_key = f"{title}|{channel}"
-                        if source_key not in sources_seen:
-                            sources_text += f"- **{title}** by {channel} - [🔗 Watch]({url})\n"
-                            sources_seen.add(source_key)
-                    
-                    # Add sources as a separate message
-                    msgs.add_ai_message(sources_text)
-                
-                # Trigger rerun to show the new messages
-                st.rerun()
-                
-            except Exception as e:
-                error_msg = f"❌ Error processing question: {e}"
-                msgs.add_ai_message(error_msg)
+            answer_question(question, msgs)
+        
+        # Hidden debug panel, shown with ?debug=1 in the URL
+        if st.query_params.get("debug") == "1":
+            with st.expander("🛠️ Debug: Latest Trace"):
+                metrics = get_metrics()
+                latest_trace = metrics.latest(st.session_state.session_id)
+                if latest_trace:
+                    st.json(latest_trace)
+                else:
+                    st.write("No questions traced in this session yet.")
+                st.markdown("**Process Metrics:**")
+                st.json(metrics.summary())
+                if metrics.latest_build():
+                    st.markdown("**Latest Build:**")
+                    st.json(metrics.latest_build())
+        
+        # Display chat history; earlier messages are paged from disk on request
+        history_pages = st.session_state.get('history_pages', 0)
+        older_msgs = msgs.older_messages(history_pages * 20) if history_pages else []
+        if len(older_msgs) + len(msgs.messages) < msgs.count():
+            if st.button("⬆️ Show earlier messages", key="load_older_messages"):
+                st.session_state.history_pages = history_pages + 1
                 st.rerun()
         
-        # Display chat history
-        for msg in msgs.messages:
+        for msg in older_msgs + msgs.messages:
             with st.chat_message(msg.type):
                 st.markdown(msg.content)
 
         # PROMINENT CHAT INPUT
         st.markdown("### 💬 Ask Your Question:")
         if question := st.chat_input(f"Type your question about {st.session_state.topic} here... (I remember our conversation!)"):
-            # Add to history first
-            msgs.add_user_message(question)
-            
-            # Generate response with history awareness
-            try:
-                # Wrap RAG chain with message history
-                rag_with_history = RunnableWithMessageHistory(
-                    st.session_state.rag_chain,
-                    lambda session_id: msgs,
-                    input_messages_key="input",
-                    history_messages_key="chat_history",
-                    output_messages_key="answer",
-                )
-                
-                # Invoke the advanced RAG chain
-                response = rag_with_history.invoke(
-                    {"input": question},
-                    config={"configurable": {"session_id": "youtube_agent"}}
-                )
-                
-                # Add response to history
-                msgs.add_ai_message(response['answer'])
-                
-                # Store sources for display
-                if 'context' in response and response['context']:
-                    sources_seen = set()
-                    sources_text = "**📚 Sources Used:**\n"
-                    for doc in response['context']:
-                        title = doc.metadata.get('title', 'Unknown')
-                        channel = doc.metadata.get('channel', 'Unknown')
-                        url = doc.metadata.get('url', '#')
-                        
-                        source_key = f"{title}|{channel}"
-                        if source_key not in sources_seen:
-                            sources_text += f"- **{title}** by {channel} - [🔗 Watch]({url})\n"
-                            sources_seen.add(source_key)
-                    
-                    # Add sources as a separate message
-                    msgs.add_ai_message(sources_text)
-                
-                # Trigger rerun to show the new messages
-                st.rerun()
-                
-            except Exception as e:
-                error_msg = f"❌ Error processing question: {e}"
-                msgs.add_ai_message(error_msg)
-                st.rerun()
+            answer_question(question, msgs)
     
     # FOOTER
     st.markdown("---")